@@ -0,0 +1,224 @@
+import threading
+from datetime import datetime, timedelta
+from math import gcd
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+class PolyphaseResampler:
+    """Streaming rational-ratio resampler with a channel downmix in front.
+
+    A Kaiser-windowed sinc low-pass is split into `up` polyphase branches;
+    every output sample is one dot product of a branch with the most recent
+    input frames, computed for a whole chunk at once. The last few input
+    frames are carried over so chunk boundaries are seamless.
+    """
+    def __init__(self, input_rate, output_rate, input_channels, output_channels, taps_per_phase=64):
+        divisor = gcd(int(input_rate), int(output_rate))
+        self.up = int(output_rate) // divisor
+        self.down = int(input_rate) // divisor
+        self.input_channels = input_channels
+        self.output_channels = output_channels
+        self.taps = taps_per_phase
+
+        # Prototype low-pass at the lower of the two Nyquist frequencies, in the upsampled domain
+        length = self.taps * self.up
+        cutoff = 0.9 / (2 * max(self.up, self.down))
+        t = np.arange(length) - (length - 1) / 2
+        prototype = 2 * cutoff * np.sinc(2 * cutoff * t) * np.kaiser(length, 8.0)
+        prototype *= self.up / prototype.sum()
+
+        # Branch p holds taps p, p + up, p + 2*up, ... reversed to line up with input windows
+        self.branches = prototype.reshape(self.taps, self.up).T[:, ::-1].astype(np.float32)
+
+        self.history = np.zeros((self.taps - 1, output_channels), dtype=np.float32)
+        self.input_frames = 0   # Input frames consumed so far
+        self.output_frames = 0  # Output frames produced so far
+
+    def process(self, chunk):
+        """Downmix and resample an int16 chunk, returning int16 frames"""
+        frames = chunk.astype(np.float32)
+        if self.output_channels == 1 and self.input_channels > 1:
+            frames = frames.mean(axis=1, keepdims=True)
+        elif self.output_channels < self.input_channels:
+            frames = frames[:, :self.output_channels]
+
+        if self.up == self.down:
+            return self._to_int16(frames)
+
+        buffer = np.concatenate((self.history, frames), axis=0)
+        base = self.input_frames - len(self.history)  # Input index of buffer[0]
+        self.input_frames += len(frames)
+
+        # Every output m whose newest input frame (m * down // up) has arrived
+        last_output = (self.input_frames * self.up - 1) // self.down
+        outputs = np.arange(self.output_frames, last_output + 1)
+        self.history = buffer[len(buffer) - (self.taps - 1):]
+        if len(outputs) == 0:
+            return np.zeros((0, self.output_channels), dtype=np.int16)
+        self.output_frames = last_output + 1
+
+        positions = outputs * self.down
+        newest = positions // self.up - base
+        phases = positions % self.up
+
+        windows = sliding_window_view(buffer, self.taps, axis=0)  # (n, channels, taps)
+        resampled = np.einsum('mct,mt->mc', windows[newest - (self.taps - 1)], self.branches[phases])
+        return self._to_int16(resampled)
+
+    def _to_int16(self, frames):
+        return np.clip(np.rint(frames), -32768, 32767).astype(np.int16)
+
+
+class SilenceTrimmer:
+    """Collapse long silent spans in a stream of int16 chunks.
+
+    Audio is split into short windows and each window's RMS level is compared
+    against a threshold in one vectorized pass per chunk. Loud windows are
+    kept, and so is the first `keep_silence_ms` of every silent run so speech
+    is not glued together; the rest of the silence is dropped. Every kept span
+    is recorded so compacted offsets can be mapped back to wall-clock time.
+    """
+    def __init__(self, sample_rate, channels, threshold_db=-45.0, window_ms=30, keep_silence_ms=500):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.window = max(1, int(sample_rate * window_ms / 1000))
+        self.threshold = 32768 * 10 ** (threshold_db / 20)
+        self.keep_windows = max(0, int(keep_silence_ms / window_ms))
+
+        self.pending = None       # Frames left over from the last chunk (< one window)
+        self.silent_windows = 0   # Length of the silent run the last chunk ended in
+        self.input_frames = 0     # Position in the captured (wall-clock) stream
+        self.output_frames = 0    # Position in the compacted stream
+        self.spans = []           # [output_start, input_start, length] in frames
+
+    def process(self, chunk):
+        """Return the part of the chunk that should be kept (may be empty)"""
+        if self.pending is not None:
+            chunk = np.concatenate((self.pending, chunk), axis=0)
+            self.pending = None
+
+        window_count = len(chunk) // self.window
+        usable = window_count * self.window
+        if usable < len(chunk):
+            self.pending = chunk[usable:]
+        if window_count == 0:
+            return chunk[:0]
+
+        frames = chunk[:usable]
+        windows = frames.reshape(window_count, self.window * self.channels).astype(np.float32)
+        loud = np.sqrt(np.mean(windows * windows, axis=1)) >= self.threshold
+
+        # Length of the silent run each window belongs to, continuing the run
+        # carried over from the previous chunk
+        index = np.arange(window_count)
+        last_loud = np.maximum.accumulate(np.where(loud, index, -1))
+        run_length = np.where(last_loud >= 0, index - last_loud, index + 1 + self.silent_windows)
+        keep = loud | (run_length <= self.keep_windows)
+
+        if loud.any():
+            self.silent_windows = int(window_count - 1 - last_loud[-1])
+        else:
+            self.silent_windows += window_count
+
+        self._record_spans(keep)
+        self.input_frames += usable
+
+        if keep.all():
+            return frames
+        kept = frames.reshape(window_count, self.window, self.channels)[keep]
+        return kept.reshape(-1, self.channels)
+
+    def flush(self):
+        """Return the frames still held back at the end of the recording"""
+        if self.pending is None:
+            return None
+        pending, self.pending = self.pending, None
+        self._add_span(self.input_frames, len(pending))
+        self.input_frames += len(pending)
+        return pending
+
+    def _record_spans(self, keep):
+        edges = np.diff(np.concatenate(([0], keep.astype(np.int8), [0])))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+        for start, end in zip(starts, ends):
+            self._add_span(self.input_frames + int(start) * self.window, int(end - start) * self.window)
+
+    def _add_span(self, input_start, length):
+        last = self.spans[-1] if self.spans else None
+        if last and last[1] + last[2] == input_start:
+            last[2] += length
+        else:
+            self.spans.append([self.output_frames, input_start, length])
+        self.output_frames += length
+
+    def index(self, started_at):
+        """Sidecar index mapping compacted offsets to source offsets and wall-clock time"""
+        start = datetime.fromtimestamp(started_at)
+        rate = self.sample_rate
+        return {
+            'sample_rate': rate,
+            'recording_started_at': start.isoformat(),
+            'source_seconds': round(self.input_frames / rate, 3),
+            'compacted_seconds': round(self.output_frames / rate, 3),
+            'spans': [
+                {
+                    'output_start': round(output_start / rate, 3),
+                    'source_start': round(input_start / rate, 3),
+                    'duration': round(length / rate, 3),
+                    'wall_clock_start': (start + timedelta(seconds=input_start / rate)).isoformat()
+                }
+                for output_start, input_start, length in self.spans
+            ]
+        }
+
+
+class AudioActivity:
+    """Rolling loudness statistics of the captured audio for the meeting monitor.
+
+    Each chunk is split into short windows whose RMS is computed in one
+    vectorized pass. Only the latest level and the length of the silent run
+    the audio currently ends in are kept, so reading the stats from another
+    thread is cheap.
+    """
+    def __init__(self, sample_rate, channels, threshold_db=-50.0, window_ms=100):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.window = max(1, int(sample_rate * window_ms / 1000))
+        self.threshold = 32768 * 10 ** (threshold_db / 20)
+        self.lock = threading.Lock()
+
+        self.frames = 0           # Frames analysed so far
+        self.silent_frames = 0    # Length of the silent run the audio ends in
+        self.level_db = None      # Level of the latest chunk
+        self.heard_audio = False  # Any window above the threshold yet
+
+    def process(self, chunk):
+        window_count = len(chunk) // self.window
+        if window_count == 0:
+            return
+        usable = window_count * self.window
+        windows = chunk[:usable].reshape(window_count, self.window * self.channels).astype(np.float32)
+        rms = np.sqrt(np.mean(windows * windows, axis=1))
+        loud = np.flatnonzero(rms >= self.threshold)
+        level = float(np.sqrt(np.mean(rms * rms)))
+
+        with self.lock:
+            self.frames += usable
+            if len(loud):
+                self.heard_audio = True
+                self.silent_frames = (window_count - 1 - int(loud[-1])) * self.window
+            else:
+                self.silent_frames += usable
+            self.level_db = 20 * np.log10(max(level, 1.0) / 32768)
+
+    def stats(self):
+        with self.lock:
+            return {
+                'level_db': round(float(self.level_db), 1) if self.level_db is not None else None,
+                'silent_seconds': round(self.silent_frames / self.sample_rate, 1),
+                'heard_audio': self.heard_audio,
+                'seconds': round(self.frames / self.sample_rate, 1)
+            }
@@ -2,12 +2,18 @@ import sounddevice as sd
 import numpy as np
 import wave
 import threading
+import json
+from concurrent.futures import wait as wait_futures
 from datetime import datetime
 import os
 import time
-import boto3
-from botocore.exceptions import ClientError
 from dotenv import load_dotenv
+from audio_writers import SegmentManifest, StreamingAudioWriter, WavChunkReader, WavEncoder, get_encoder
+from live_upload import LiveMultipartUpload
+from audio_processing import AudioActivity, PolyphaseResampler, SilenceTrimmer
+from upload_manager import get_upload_manager
+from storage_client import get_bucket_name, get_s3_client
+from pulse_audio import pulse_input_device
 
 load_dotenv()
 
@@ -16,16 +22,144 @@ IS_GITHUB_ACTIONS = os.environ.get('GITHUB_ACTIONS') == 'true'
 IS_RENDER = os.environ.get('RENDER') == 'true'
 IS_LOCAL = not (IS_GITHUB_ACTIONS or IS_RENDER)
 
+# Output formats; capture always happens at the device's native format and is
+# downmixed/resampled to these
+AUDIO_PROFILES = {
+    'speech': {'sample_rate': 16000, 'channels': 1},
+    'full': {'sample_rate': 44100, 'channels': 1},
+}
+
+class AudioRingBuffer:
+    """Single-producer/single-consumer ring buffer for int16 audio frames.
+
+    The PortAudio callback is the only writer and the recorder thread is the
+    only reader. Each side only advances its own counter, so no lock is needed
+    and the callback never blocks.
+    """
+    def __init__(self, capacity_frames, channels):
+        self.capacity = capacity_frames
+        self.buffer = np.zeros((capacity_frames, channels), dtype='int16')
+        self.write_index = 0  # Total frames ever written
+        self.read_index = 0   # Total frames ever read
+        self.dropped_frames = 0
+
+    def write(self, frames):
+        """Copy frames into the buffer, dropping whatever does not fit"""
+        count = len(frames)
+        free = self.capacity - (self.write_index - self.read_index)
+        if count > free:
+            self.dropped_frames += count - free
+            count = free
+        if count <= 0:
+            return
+
+        start = self.write_index % self.capacity
+        first = min(count, self.capacity - start)
+        self.buffer[start:start + first] = frames[:first]
+        if first < count:
+            self.buffer[:count - first] = frames[first:count]
+
+        # Publish only after the copy is complete
+        self.write_index += count
+
+    def read(self):
+        """Return a copy of all frames written since the last read"""
+        count = self.write_index - self.read_index
+        if count <= 0:
+            return None
+
+        start = self.read_index % self.capacity
+        first = min(count, self.capacity - start)
+        if first == count:
+            frames = self.buffer[start:start + count].copy()
+        else:
+            frames = np.concatenate((self.buffer[start:], self.buffer[:count - first]), axis=0)
+
+        self.read_index += count
+        return frames
+
 class AudioRecorder:
-    def __init__(self, sample_rate=44100, channels=1, upload_to_b2=True):
+    def __init__(self, sample_rate=None, channels=None, upload_to_b2=True, capture_mode=None, stream_to_disk=True,
+                 live_upload=None, output_format=None, trim_silence=None, silence_threshold_db=-45.0,
+                 profile=None, segment_minutes=None, source=None, tab_capture=None):
+        # Explicit sample_rate/channels override the profile's target format
+        self.profile = profile or os.environ.get('AUDIO_PROFILE', 'speech')
+        if self.profile not in AUDIO_PROFILES:
+            print(f"⚠️ Unknown audio profile '{self.profile}', using 'speech'")
+            self.profile = 'speech'
+        sample_rate = sample_rate or AUDIO_PROFILES[self.profile]['sample_rate']
         self.sample_rate = sample_rate
-        self.channels = channels
+        self.channels = channels or AUDIO_PROFILES[self.profile]['channels']
+
+        # PulseAudio source to capture from (a session sink's monitor); None means the
+        # default input device
+        self.source = source
+        self.device = None
+
+        # Device format, resolved when recording starts
+        self.capture_rate = self.sample_rate
+        self.capture_channels = self.channels
+        self.resampler = None
         self.recording = None
         self.is_recording = False
         self.record_thread = None
         self.recorded_data = []
         self.upload_to_b2 = upload_to_b2
-        
+
+        # 'stream' keeps one InputStream open for the whole meeting,
+        # 'chunked' is the legacy sd.rec() loop, 'tab' reads the meeting's
+        # audio out of the browser page through `tab_capture` (a TabAudioCapture)
+        self.capture_mode = capture_mode or os.environ.get('AUDIO_CAPTURE_MODE', 'stream')
+        self.tab_capture = tab_capture
+        if self.capture_mode == 'tab' and not tab_capture:
+            print("⚠️ Tab capture needs a browser page to record from, using the input device")
+            self.capture_mode = 'stream'
+        self.ring_buffer = None
+        self.ring_buffer_seconds = 30
+        self.overflow_count = 0
+        self.frames_captured = 0
+
+        # Write chunks to disk as they arrive instead of keeping the meeting in RAM
+        self.stream_to_disk = stream_to_disk
+        self.writer = None
+
+        # Encoder used by the streaming writer: 'flac' (lossless), 'opus' (speech) or 'wav'.
+        # In-memory recordings are always WAV.
+        self.output_format = output_format or os.environ.get('AUDIO_FORMAT', 'flac')
+        self.encoder = WavEncoder
+
+        # Optional VAD stage that collapses long silences before anything is stored
+        if trim_silence is None:
+            trim_silence = os.environ.get('AUDIO_TRIM_SILENCE', 'false') == 'true'
+        self.trim_silence = trim_silence
+        self.silence_threshold_db = silence_threshold_db
+        self.silence_trimmer = None
+        # Loudness stats of the capture, read by the meeting-end detection
+        self.activity = None
+
+        # Rotate output into fixed-length segments that are finalized and uploaded as
+        # they complete (default on in GitHub Actions, where runs can be killed)
+        if segment_minutes is None:
+            segment_minutes = float(os.environ.get('AUDIO_SEGMENT_MINUTES', '5' if IS_GITHUB_ACTIONS else '0'))
+        self.segment_minutes = segment_minutes
+        self.segment_frames = 0
+        self.segment_frames_written = 0
+        self.manifest = None
+        self.segment_futures = []  # (segment index, upload future)
+        # Published manifests only list segments already in B2, and never go backwards
+        self.manifest_lock = threading.Lock()
+        self.uploaded_segments = set()
+        self.manifest_version = None
+        self.file_stem = None
+
+        # Push multipart parts to B2 during the meeting (default on in GitHub Actions
+        # without segments, where the upload tail competes with the workflow timeout)
+        if live_upload is None:
+            live_default = 'true' if IS_GITHUB_ACTIONS and not self.segment_minutes else 'false'
+            live_upload = os.environ.get('B2_LIVE_UPLOAD', live_default) == 'true'
+        self.live_upload = live_upload
+        self.live_uploader = None
+
         # Environment-specific settings
         if IS_GITHUB_ACTIONS:
             print("🔧 AudioRecorder: Running in GitHub Actions mode")
@@ -42,13 +176,10 @@ class AudioRecorder:
         # Initialize B2 client if uploading is enabled
         if self.upload_to_b2:
             try:
-                self.s3_client = boto3.client(
-                    's3',
-                    endpoint_url=os.environ.get('B2_ENDPOINT'),
-                    aws_access_key_id=os.environ.get('B2_KEY_ID'),
-                    aws_secret_access_key=os.environ.get('B2_APPLICATION_KEY')
-                )
-                self.bucket_name = os.environ.get('B2_BUCKET_NAME')
+                # Shared across recorders so setup and TLS connections are paid once per process
+                self.s3_client = get_s3_client()
+                self.bucket_name = get_bucket_name()
+                self.uploads = get_upload_manager()
                 print("✅ B2 storage connection initialized")
                 
                 if IS_GITHUB_ACTIONS:
@@ -86,83 +217,143 @@ class AudioRecorder:
         clean_meeting_name = "".join(c for c in meeting_name if c.isalnum() or c in (' ', '-', '_')).strip()
         clean_meeting_name = clean_meeting_name.replace(' ', '_')[:50]  # Limit length
         
-        filename = f"recordings/meeting_{clean_meeting_name}_{timestamp}.wav"
+        # Stream to disk only where a local file is allowed
+        use_writer = self.stream_to_disk and (not IS_GITHUB_ACTIONS or self.upload_to_b2)
+        self.encoder = get_encoder(self.output_format, self.sample_rate) if use_writer else WavEncoder
+
+        segmented = use_writer and self.segment_minutes > 0
+
+        file_stem = f"recordings/meeting_{clean_meeting_name}_{timestamp}"
+        self.file_stem = file_stem
+        if segmented:
+            filename = f"{file_stem}.manifest.json"
+        else:
+            filename = f"{file_stem}.{self.encoder.extension}"
         
         print(f"🎵 Starting audio recording: {filename}")
-        print(f"🔊 Sample rate: {self.sample_rate} Hz")
+        self._configure_capture()
+
+        print(f"🔊 Sample rate: {self.sample_rate} Hz (profile: {self.profile})")
         print(f"📊 Channels: {self.channels}")
+        if self.resampler:
+            print(f"🔁 Capturing {self.capture_rate} Hz x{self.capture_channels}, converting to {self.sample_rate} Hz x{self.channels}")
+        print(f"🗜️ Codec: {self.encoder.codec}")
+        print(f"🎚️ Capture mode: {self.capture_mode}")
         print(f"⏱️ Max duration: {duration_minutes} minutes")
         
-        if self.upload_to_b2:
+        if self.upload_to_b2 and segmented:
+            print(f"📤 Will upload each {self.segment_minutes:g}-minute segment to B2 as it completes")
+        elif self.upload_to_b2 and self.live_upload and self.stream_to_disk:
+            print("📤 Will upload to B2 storage while recording")
+        elif self.upload_to_b2:
             print("📤 Will upload to B2 storage after recording")
         elif IS_GITHUB_ACTIONS:
             print("⚠️ GitHub Actions without B2: Recording will be lost after workflow ends")
         
         self.is_recording = True
         self.recorded_data = []  # Reset recorded data
+        self.overflow_count = 0
+        self.frames_captured = 0
         self.start_time = time.time()  # Track recording start time
-        
+
+        self.silence_trimmer = None
+        if self.trim_silence:
+            self.silence_trimmer = SilenceTrimmer(self.sample_rate, self.channels, threshold_db=self.silence_threshold_db)
+            print(f"✂️ Silence trimming enabled (threshold {self.silence_threshold_db} dB)")
+
+        self.writer = None
+        self.manifest = None
+        if use_writer:
+            try:
+                if segmented:
+                    self.manifest = SegmentManifest(
+                        filename, self.sample_rate, self.channels, self.encoder,
+                        self.segment_minutes, self.start_time
+                    )
+                    self.segment_frames = int(self.segment_minutes * 60 * self.sample_rate)
+                    self.segment_futures = []
+                    self.uploaded_segments = set()
+                    self.manifest_version = None
+                    self._open_next_segment()
+                else:
+                    self.writer = StreamingAudioWriter(filename, self.sample_rate, self.channels, encoder=self.encoder)
+                print(f"💽 Encoding {self.encoder.name.upper()} to disk while recording")
+            except Exception as e:
+                print(f"⚠️ Could not open streaming writer: {e}")
+                print("🔄 Keeping recording in memory instead")
+                self.writer = None
+                self.manifest = None
+                self.encoder = WavEncoder
+                filename = f"{file_stem}.{self.encoder.extension}"
+
+        # Live upload follows the file the streaming writer produces
+        self.live_uploader = None
+        if self.live_upload and self.manifest:
+            print("ℹ️ Segmented recording: segments are uploaded as they complete instead of live multipart")
+        elif self.upload_to_b2 and self.live_upload and self.writer:
+            try:
+                self.live_uploader = LiveMultipartUpload(
+                    self.s3_client,
+                    self.bucket_name,
+                    self._b2_key(filename),
+                    filename,
+                    content_type=self.encoder.content_type,
+                    metadata=self._upload_metadata(upload_mode='live-multipart')
+                )
+                self.live_uploader.start()
+            except Exception as e:
+                print(f"⚠️ Could not start live upload: {e}")
+                print("📤 Will upload after recording instead")
+                self.live_uploader = None
+
         # Start recording in a separate thread with streaming
         def record_audio():
             try:
                 print("🎙️ Recording started... Will auto-stop when meeting ends")
-                
-                # Record in chunks so we can stop dynamically
-                chunk_duration = 2.0 if IS_GITHUB_ACTIONS else 1.0  # Larger chunks in GitHub Actions
-                chunk_frames = int(chunk_duration * self.sample_rate)
-                max_duration_seconds = duration_minutes * 60
-                
-                while self.is_recording:
-                    # Check if we've exceeded maximum duration
-                    elapsed_time = time.time() - self.start_time
-                    if elapsed_time > max_duration_seconds:
-                        print(f"⏰ Maximum recording duration ({duration_minutes} minutes) reached")
-                        break
-                    
+
+                if self.capture_mode == 'tab':
                     try:
-                        # Record a chunk with timeout protection
-                        chunk = sd.rec(
-                            chunk_frames, 
-                            samplerate=self.sample_rate, 
-                            channels=self.channels,
-                            dtype='int16'
-                        )
-                        sd.wait()  # Wait for this chunk to complete
-                        
-                        if self.is_recording:  # Check if we should still be recording
-                            self.recorded_data.append(chunk)
-                            
-                            # Progress indicator for longer recordings
-                            if IS_GITHUB_ACTIONS and len(self.recorded_data) % 30 == 0:  # Every minute
-                                minutes_recorded = len(self.recorded_data) * chunk_duration / 60
-                                print(f"🎙️ Recording progress: {minutes_recorded:.1f} minutes")
-                    
-                    except Exception as chunk_error:
-                        print(f"⚠️ Audio chunk recording error: {chunk_error}")
-                        if IS_GITHUB_ACTIONS:
-                            # In GitHub Actions, audio issues are more common, so be more tolerant
-                            print("🔄 Continuing recording despite audio error...")
-                            continue
-                        else:
-                            break
-                
+                        self._capture_tab(duration_minutes)
+                    except Exception as tab_error:
+                        print(f"⚠️ Tab audio capture failed: {tab_error}")
+                        print("🔄 Falling back to the input device...")
+                        self.capture_mode = 'stream'
+                        self._configure_capture()
+                        self._capture_stream(duration_minutes)
+                elif self.capture_mode == 'stream':
+                    try:
+                        self._capture_stream(duration_minutes)
+                    except sd.PortAudioError as stream_error:
+                        print(f"⚠️ Could not open persistent input stream: {stream_error}")
+                        print("🔄 Falling back to chunked capture...")
+                        self._capture_chunked(duration_minutes)
+                else:
+                    self._capture_chunked(duration_minutes)
+
                 # Save the recording
-                if self.recorded_data:
+                if self.frames_captured:
                     self.save_recording(filename)
                 else:
                     print("❌ No audio data recorded")
+                    self._discard_writer()
                 
             except KeyboardInterrupt:
                 print("\n🛑 Recording stopped by user")
-                if self.recorded_data:
+                if self.frames_captured:
                     self.save_recording(filename)
             except Exception as e:
                 print(f"❌ Recording error: {e}")
                 if IS_GITHUB_ACTIONS:
                     print("🔄 GitHub Actions: Attempting to save partial recording...")
-                    if self.recorded_data:
+                    if self.frames_captured:
                         self.save_recording(filename)
             finally:
+                # Leaves a valid (partial) WAV behind if saving was skipped
+                if self.writer:
+                    self.writer.close()
+                # No-op once the upload has completed
+                if self.live_uploader:
+                    self.live_uploader.abort()
                 self.is_recording = False
         
         # Start recording thread
@@ -170,9 +361,401 @@ class AudioRecorder:
         self.record_thread.start()
         
         return filename
-    
+
+    @property
+    def dropped_frames(self):
+        """Frames the capture callback could not fit into the ring buffer"""
+        return self.ring_buffer.dropped_frames if self.ring_buffer else 0
+
+    def activity_stats(self):
+        """Rolling loudness stats of the capture (see AudioActivity.stats), or None before any audio arrived"""
+        if not self.activity or not self.activity.frames:
+            return None
+        return self.activity.stats()
+
+    def _audio_callback(self, indata, frames, time_info, status):
+        """PortAudio callback - runs on the audio thread, must never block"""
+        if status.input_overflow:
+            self.overflow_count += 1
+        self.ring_buffer.write(indata)
+
+    def _configure_capture(self):
+        """Settle the capture format and the stages that convert it to the target format"""
+        if self.capture_mode == 'tab':
+            # The page's AudioContext already runs at the target rate
+            self.capture_rate, self.capture_channels = self.sample_rate, self.channels
+        else:
+            # Capture at whatever the device runs at natively, convert in the pipeline
+            self._resolve_input_device()
+            self.capture_rate, self.capture_channels = self._resolve_capture_format()
+        self.resampler = None
+        if (self.capture_rate, self.capture_channels) != (self.sample_rate, self.channels):
+            self.resampler = PolyphaseResampler(self.capture_rate, self.sample_rate, self.capture_channels, self.channels)
+        self.activity = AudioActivity(self.capture_rate, self.capture_channels)
+
+    def _resolve_input_device(self):
+        """Point capture at the configured PulseAudio source, if there is one"""
+        if not self.source:
+            return
+        device = pulse_input_device()
+        if device is None:
+            print(f"⚠️ No PulseAudio input device, cannot capture from {self.source} - using the default input")
+            return
+        # The ALSA pulse plugin reads PULSE_SOURCE when a stream opens; every
+        # session runs in its own process, so this only affects this recorder
+        os.environ['PULSE_SOURCE'] = self.source
+        self.device = device
+        print(f"🎧 Capturing from PulseAudio source: {self.source}")
+
+    def _resolve_capture_format(self):
+        """Native sample rate and channel count (at most stereo) of the input device"""
+        try:
+            device = sd.query_devices(self.device, kind='input')
+            capture_rate = int(device['default_samplerate'])
+            capture_channels = max(self.channels, min(int(device['max_input_channels']), 2))
+            return capture_rate, capture_channels
+        except Exception as e:
+            print(f"⚠️ Could not query input device ({e}), capturing at the target format")
+            return self.sample_rate, self.channels
+
+    def _store_chunk(self, chunk):
+        """Run a captured chunk through the processing stages and store the result"""
+        self.frames_captured += len(chunk)
+        self.activity.process(chunk)
+
+        if self.resampler:
+            chunk = self.resampler.process(chunk)
+
+        if self.silence_trimmer:
+            chunk = self.silence_trimmer.process(chunk)
+
+        self._write_chunk(chunk)
+
+    def _write_chunk(self, chunk):
+        """Hand a processed chunk to the disk writer, or keep it in memory"""
+        if chunk is None or not len(chunk):
+            return
+        if self.manifest:
+            self._write_segmented(chunk)
+        elif self.writer:
+            self.writer.write(chunk)
+        else:
+            self.recorded_data.append(chunk)
+
+    def _write_segmented(self, chunk):
+        """Write a chunk, rotating to a new segment file whenever one fills up"""
+        while len(chunk):
+            room = self.segment_frames - self.segment_frames_written
+            part, chunk = chunk[:room], chunk[room:]
+            self.writer.write(part)
+            self.segment_frames_written += len(part)
+
+            if self.segment_frames_written >= self.segment_frames:
+                self._finish_segment()
+                self._open_next_segment()
+
+    def _open_next_segment(self):
+        index = len(self.manifest.segments) + 1
+        segment_filename = f"{self.file_stem}_part{index:03d}.{self.encoder.extension}"
+        self.writer = StreamingAudioWriter(segment_filename, self.sample_rate, self.channels, encoder=self.encoder)
+        self.segment_frames_written = 0
+        print(f"🧩 Recording segment {index}: {segment_filename}")
+
+    def _finish_segment(self):
+        """Finalize the current segment, add it to the manifest and queue its upload"""
+        writer = self.writer
+        writer.close()
+
+        if writer.frames_written == 0:
+            try:
+                os.remove(writer.filename)
+            except OSError:
+                pass
+            return
+
+        size_bytes = os.path.getsize(writer.filename)
+        segment = self.manifest.add_segment(writer.filename, writer.frames_written, size_bytes, self._b2_key(writer.filename))
+        self.manifest.save()
+        print(f"🧩 Segment {segment['index']} finalized: {segment['duration_seconds'] / 60:.2f} minutes, {size_bytes / (1024 * 1024):.2f} MB")
+
+        if self.upload_to_b2:
+            future = self.upload_to_b2_storage(writer.filename, size_bytes / (1024 * 1024))
+            if future:
+                self.segment_futures.append((segment['index'], future))
+                # Manifest goes after its segment so it never references a missing object
+                future.add_done_callback(lambda done, index=segment['index']: self._segment_uploaded(index, done))
+
+    @staticmethod
+    def _upload_succeeded(future):
+        return not future.cancelled() and future.exception() is None and bool(future.result())
+
+    def _segment_uploaded(self, index, future):
+        """Upload callback: publish a manifest that includes the segment, if it reached B2"""
+        if not self._upload_succeeded(future):
+            return
+        with self.manifest_lock:
+            self.uploaded_segments.add(index)
+        self._upload_manifest()
+
+    def _upload_manifest(self):
+        """PUT the manifest, listing only the segments already in B2.
+
+        Uploads are serialized by the lock and each is built from the state
+        at that moment; one that would not add anything over the last
+        published manifest is skipped, so an older manifest cannot land
+        after a newer one. Returns True if B2 holds the current state.
+        """
+        with self.manifest_lock:
+            manifest = self.manifest.to_dict()
+            manifest['segments'] = [segment for segment in manifest['segments'] if segment['index'] in self.uploaded_segments]
+            manifest['complete'] = manifest['complete'] and len(manifest['segments']) == len(self.manifest.segments)
+            version = (len(manifest['segments']), manifest['complete'])
+            if self.manifest_version is not None and version <= self.manifest_version:
+                return True
+            try:
+                self.s3_client.put_object(
+                    Bucket=self.bucket_name,
+                    Key=self._b2_key(self.manifest.filename),
+                    Body=json.dumps(manifest, indent=2).encode(),
+                    ContentType='application/json',
+                    Metadata=self._upload_metadata()
+                )
+                self.manifest_version = version
+                return True
+            except Exception as e:
+                print(f"❌ Manifest upload failed: {e}")
+                return False
+
+    def finalize_segmented_recording(self, filename):
+        """Finalize the last segment, mark the manifest complete and wait for uploads"""
+        try:
+            print("💾 Finalizing segmented recording...")
+            self._finish_segment()
+            self.writer = None
+
+            self.manifest.complete = True
+            self.manifest.save()
+
+            duration_seconds = self.manifest.total_frames / self.sample_rate
+            total_size = sum(segment['size_bytes'] for segment in self.manifest.segments) / (1024 * 1024)
+            print(f"📁 Manifest saved locally: {filename}")
+            print(f"🧩 Segments: {len(self.manifest.segments)}")
+            print(f"📊 Total size: {total_size:.2f} MB")
+            print(f"⏱️ Duration: {duration_seconds / 60:.2f} minutes ({duration_seconds:.1f} seconds)")
+
+            if self.upload_to_b2:
+                print("⏳ Waiting for segment uploads to finish...")
+                wait_futures([future for _, future in self.segment_futures])
+                # Done callbacks may still be running; record the outcomes here
+                with self.manifest_lock:
+                    self.uploaded_segments.update(
+                        index for index, future in self.segment_futures if self._upload_succeeded(future)
+                    )
+                if self._upload_manifest() and self.manifest_version[1]:
+                    self._cleanup_local_file(filename)
+                else:
+                    print(f"⚠️ Not every segment reached B2 - local manifest kept: {filename}")
+
+        except Exception as e:
+            print(f"❌ Error finalizing segmented recording: {e}")
+            if IS_GITHUB_ACTIONS:
+                import traceback
+                traceback.print_exc()
+
+    def _flush_pipeline(self):
+        """Push out frames the processing stages are still holding back"""
+        if self.silence_trimmer:
+            self._write_chunk(self.silence_trimmer.flush())
+
+            source_minutes = self.silence_trimmer.input_frames / self.sample_rate / 60
+            kept_minutes = self.silence_trimmer.output_frames / self.sample_rate / 60
+            print(f"✂️ Silence trimmed: kept {kept_minutes:.2f} of {source_minutes:.2f} minutes")
+
+    def _save_trim_index(self, filename):
+        """Write (and upload) the sidecar index mapping compacted audio to wall-clock time"""
+        if not self.silence_trimmer:
+            return
+
+        index_body = json.dumps(self.silence_trimmer.index(self.start_time), indent=2)
+        index_filename = f"{self.file_stem}.index.json"
+
+        local_saved = False
+        if not IS_GITHUB_ACTIONS or self.upload_to_b2:
+            with open(index_filename, 'w') as index_file:
+                index_file.write(index_body)
+            local_saved = True
+            print(f"🗂️ Silence index saved: {index_filename}")
+
+        if self.upload_to_b2:
+            try:
+                self.s3_client.put_object(
+                    Bucket=self.bucket_name,
+                    Key=self._b2_key(index_filename),
+                    Body=index_body.encode('utf-8'),
+                    ContentType='application/json',
+                    Metadata=self._upload_metadata()
+                )
+                print(f"✅ Silence index uploaded: {self._b2_key(index_filename)}")
+                if local_saved:
+                    self._cleanup_local_file(index_filename)
+            except Exception as e:
+                print(f"❌ Silence index upload failed: {e}")
+
+    def _discard_writer(self):
+        """Close the streaming writer and remove its (empty) file"""
+        if not self.writer:
+            return
+        self.writer.close()
+        try:
+            os.remove(self.writer.filename)
+        except OSError:
+            pass
+
+    def _drain_ring_buffer(self):
+        """Move everything the callback captured into the recording"""
+        chunk = self.ring_buffer.read()
+        if chunk is not None:
+            self._store_chunk(chunk)
+
+    def _capture_stream(self, duration_minutes):
+        """Capture through a single persistent InputStream until stopped"""
+        drain_interval = 2.0 if IS_GITHUB_ACTIONS else 1.0
+        max_duration_seconds = duration_minutes * 60
+        self.ring_buffer = AudioRingBuffer(int(self.ring_buffer_seconds * self.capture_rate), self.capture_channels)
+        minutes_reported = 0
+
+        with sd.InputStream(
+            device=self.device,
+            samplerate=self.capture_rate,
+            channels=self.capture_channels,
+            dtype='int16',
+            latency='high',
+            callback=self._audio_callback
+        ):
+            while self.is_recording:
+                # Check if we've exceeded maximum duration
+                elapsed_time = time.time() - self.start_time
+                if elapsed_time > max_duration_seconds:
+                    print(f"⏰ Maximum recording duration ({duration_minutes} minutes) reached")
+                    break
+
+                time.sleep(drain_interval)
+                self._drain_ring_buffer()
+
+                # Progress indicator for longer recordings
+                minutes_recorded = self.frames_captured / self.capture_rate / 60
+                if IS_GITHUB_ACTIONS and int(minutes_recorded) > minutes_reported:
+                    minutes_reported = int(minutes_recorded)
+                    print(f"🎙️ Recording progress: {minutes_recorded:.1f} minutes")
+
+        # Pick up whatever arrived between the last drain and the stream closing
+        self._drain_ring_buffer()
+
+        if self.overflow_count or self.dropped_frames:
+            print(f"⚠️ Capture stats: {self.overflow_count} input overflows, {self.dropped_frames} dropped frames")
+        else:
+            print("✅ Capture stats: no overflows or dropped frames")
+
+    def _capture_tab(self, duration_minutes):
+        """Pull the audio the meeting page captured, until stopped"""
+        drain_interval = 2.0 if IS_GITHUB_ACTIONS else 1.0
+        max_duration_seconds = duration_minutes * 60
+        read_errors = 0
+        self.tab_capture.start(self.capture_rate)
+        print(f"🌐 Capturing meeting audio inside the browser page ({self.capture_rate} Hz)")
+
+        try:
+            while self.is_recording:
+                # Check if we've exceeded maximum duration
+                elapsed_time = time.time() - self.start_time
+                if elapsed_time > max_duration_seconds:
+                    print(f"⏰ Maximum recording duration ({duration_minutes} minutes) reached")
+                    break
+
+                time.sleep(drain_interval)
+                try:
+                    self._store_tab_chunk(self.tab_capture.read())
+                    read_errors = 0
+                except Exception as read_error:
+                    # The page keeps buffering; a busy or briefly unreachable browser is retried
+                    read_errors += 1
+                    print(f"⚠️ Tab audio read error: {read_error}")
+                    if read_errors >= 10:
+                        print("❌ Browser page unreachable - ending tab capture")
+                        break
+        finally:
+            try:
+                self._store_tab_chunk(self.tab_capture.read())
+            except Exception:
+                pass
+            self.tab_capture.stop()
+
+        print(f"✅ Capture stats: {self.tab_capture.tracks} remote audio tracks, "
+              f"{self.tab_capture.dropped_frames} frames dropped in the page")
+
+    def _store_tab_chunk(self, chunk):
+        if not len(chunk):
+            return
+        if self.capture_channels > 1:
+            chunk = np.repeat(chunk, self.capture_channels, axis=1)
+        self._store_chunk(chunk)
+
+    def _capture_chunked(self, duration_minutes):
+        """Legacy capture that records one sd.rec() chunk at a time"""
+        # Record in chunks so we can stop dynamically
+        chunk_duration = 2.0 if IS_GITHUB_ACTIONS else 1.0  # Larger chunks in GitHub Actions
+        chunk_frames = int(chunk_duration * self.capture_rate)
+        max_duration_seconds = duration_minutes * 60
+
+        while self.is_recording:
+            # Check if we've exceeded maximum duration
+            elapsed_time = time.time() - self.start_time
+            if elapsed_time > max_duration_seconds:
+                print(f"⏰ Maximum recording duration ({duration_minutes} minutes) reached")
+                break
+
+            try:
+                # Record a chunk with timeout protection
+                chunk = sd.rec(
+                    chunk_frames,
+                    device=self.device,
+                    samplerate=self.capture_rate,
+                    channels=self.capture_channels,
+                    dtype='int16'
+                )
+                sd.wait()  # Wait for this chunk to complete
+
+                if self.is_recording:  # Check if we should still be recording
+                    self._store_chunk(chunk)
+
+                    # Progress indicator for longer recordings
+                    chunks_recorded = self.frames_captured // chunk_frames
+                    if IS_GITHUB_ACTIONS and chunks_recorded % 30 == 0:  # Every minute
+                        minutes_recorded = chunks_recorded * chunk_duration / 60
+                        print(f"🎙️ Recording progress: {minutes_recorded:.1f} minutes")
+
+            except Exception as chunk_error:
+                print(f"⚠️ Audio chunk recording error: {chunk_error}")
+                if IS_GITHUB_ACTIONS:
+                    # In GitHub Actions, audio issues are more common, so be more tolerant
+                    print("🔄 Continuing recording despite audio error...")
+                    continue
+                else:
+                    break
+
     def save_recording(self, filename):
         """Save the recorded audio to a WAV file and optionally upload to B2"""
+        self._flush_pipeline()
+        self._save_trim_index(filename)
+
+        if self.manifest:
+            self.finalize_segmented_recording(filename)
+            return
+
+        if self.writer:
+            self.finalize_streamed_recording(filename)
+            return
+
         if not self.recorded_data:
             print("❌ No recording data to save")
             return
@@ -180,70 +763,99 @@ class AudioRecorder:
         try:
             print("💾 Saving recording...")
             
-            # Combine all chunks
-            full_recording = np.concatenate(self.recorded_data, axis=0)
+            # Chunks are written and uploaded in place, never concatenated
+            total_frames = sum(len(chunk) for chunk in self.recorded_data)
             
             # Calculate file stats
-            duration_seconds = len(full_recording) / self.sample_rate
+            duration_seconds = total_frames / self.sample_rate
             duration_minutes = duration_seconds / 60
             
-            # Save locally first (unless GitHub Actions without B2)
-            local_saved = False
+            # Recordings kept in memory (stream_to_disk=False) go straight to B2
+            # from the chunks; a file is only written when there is no upload,
+            # or the upload failed
+            if self.upload_to_b2 and self.upload_to_b2_from_memory(filename, self.recorded_data, duration_minutes):
+                return
+            
+            # Save locally (unless GitHub Actions without B2)
             if not IS_GITHUB_ACTIONS or self.upload_to_b2:
                 with wave.open(filename, 'wb') as wf:
                     wf.setnchannels(self.channels)
                     wf.setsampwidth(2)  # 16-bit audio
                     wf.setframerate(self.sample_rate)
-                    wf.writeframes(full_recording.tobytes())
+                    for chunk in self.recorded_data:
+                        wf.writeframesraw(chunk)
                 
                 file_size = os.path.getsize(filename) / (1024 * 1024)  # MB
-                local_saved = True
                 
                 print(f"📁 Recording saved locally: {filename}")
                 print(f"📊 File size: {file_size:.2f} MB")
                 print(f"⏱️ Duration: {duration_minutes:.2f} minutes ({duration_seconds:.1f} seconds)")
+                
+                # Retry the failed in-memory upload from the file, in the background
+                if self.upload_to_b2:
+                    self.upload_to_b2_storage(filename, file_size)
             else:
                 # GitHub Actions without B2 - calculate size without saving
-                estimated_size = len(full_recording.tobytes()) / (1024 * 1024)
+                estimated_size = total_frames * self.channels * 2 / (1024 * 1024)
                 print(f"📊 Estimated file size: {estimated_size:.2f} MB")
                 print(f"⏱️ Duration: {duration_minutes:.2f} minutes ({duration_seconds:.1f} seconds)")
                 print("⚠️ GitHub Actions: File not saved locally (no B2 upload configured)")
             
-            # Upload to B2 if enabled
-            if self.upload_to_b2:
-                if local_saved:
-                    self.upload_to_b2_storage(filename, file_size)
-                else:
-                    # Direct upload from memory for GitHub Actions
-                    self.upload_to_b2_from_memory(filename, full_recording, duration_minutes)
-            
         except Exception as e:
             print(f"❌ Error saving recording: {e}")
             if IS_GITHUB_ACTIONS:
                 import traceback
                 traceback.print_exc()
     
+    def finalize_streamed_recording(self, filename):
+        """Close the streaming writer (finalizing the file header) and upload the file"""
+        try:
+            print("💾 Finalizing streamed recording...")
+            self.writer.close()
+
+            if self.writer.error:
+                print(f"⚠️ Streaming writer reported an error: {self.writer.error}")
+
+            duration_seconds = self.writer.frames_written / self.sample_rate
+            duration_minutes = duration_seconds / 60
+            file_size = os.path.getsize(filename) / (1024 * 1024)  # MB
+
+            print(f"📁 Recording saved locally: {filename}")
+            print(f"📊 File size: {file_size:.2f} MB")
+            print(f"⏱️ Duration: {duration_minutes:.2f} minutes ({duration_seconds:.1f} seconds)")
+
+            if self.live_uploader:
+                if self.live_uploader.complete():
+                    self._cleanup_local_file(filename)
+                    return
+                print("🔄 Falling back to a regular upload...")
+
+            if self.upload_to_b2:
+                self.upload_to_b2_storage(filename, file_size)
+
+        except Exception as e:
+            print(f"❌ Error finalizing recording: {e}")
+            if self.live_uploader:
+                self.live_uploader.abort()
+            if IS_GITHUB_ACTIONS:
+                import traceback
+                traceback.print_exc()
+
     def upload_to_b2_from_memory(self, filename, audio_data, duration_minutes):
-        """Upload recording directly from memory (for GitHub Actions without local storage)"""
+        """Upload a recording directly from memory, without writing it to disk.
+
+        audio_data may be a single array or the list of recorded chunks.
+        Returns True once the object is stored.
+        """
         try:
             print("📤 Uploading directly to B2 from memory...")
             
-            # Create temporary in-memory WAV file
-            import io
-            wav_buffer = io.BytesIO()
-            
-            with wave.open(wav_buffer, 'wb') as wf:
-                wf.setnchannels(self.channels)
-                wf.setsampwidth(2)
-                wf.setframerate(self.sample_rate)
-                wf.writeframes(audio_data.tobytes())
-            
-            wav_buffer.seek(0)
-            file_size_mb = len(wav_buffer.getvalue()) / (1024 * 1024)
+            # Serve header + chunks as a file without copying the audio
+            wav_buffer = WavChunkReader(audio_data, self.sample_rate, self.channels)
+            file_size_mb = wav_buffer.size / (1024 * 1024)
             
             # Upload from memory
-            file_basename = os.path.basename(filename)
-            b2_key = f"recordings/{file_basename}"
+            b2_key = self._b2_key(filename)
             
             self.s3_client.upload_fileobj(
                 wav_buffer,
@@ -251,72 +863,79 @@ class AudioRecorder:
                 b2_key,
                 ExtraArgs={
                     'ContentType': 'audio/wav',
-                    'Metadata': {
-                        'uploaded_by': 'google-meet-bot-github-actions',
-                        'file_size_mb': str(round(file_size_mb, 2)),
-                        'duration_minutes': str(round(duration_minutes, 2)),
-                        'sample_rate': str(self.sample_rate)
-                    }
+                    'Metadata': self._upload_metadata(
+                        file_size_mb=round(file_size_mb, 2),
+                        duration_minutes=round(duration_minutes, 2)
+                    )
                 }
             )
             
             print(f"✅ Successfully uploaded to B2 from memory: {b2_key}")
             print(f"📊 Uploaded size: {file_size_mb:.2f} MB")
+            return True
             
         except Exception as e:
             print(f"❌ Memory upload to B2 failed: {e}")
             import traceback
             traceback.print_exc()
+            return False
     
     def upload_to_b2_storage(self, filename, file_size_mb):
-        """Upload the recording to Backblaze B2"""
+        """Queue the recording for background upload to Backblaze B2.
+
+        Returns the upload future, or None if the upload could not be queued.
+        """
         try:
-            print("📤 Uploading to B2 storage...")
-            
             # Create B2 key (path in bucket)
-            file_basename = os.path.basename(filename)
-            b2_key = f"recordings/{file_basename}"
+            b2_key = self._b2_key(filename)
             
             # Upload file with environment metadata
-            upload_metadata = {
-                'uploaded_by': f'google-meet-bot-{("github-actions" if IS_GITHUB_ACTIONS else "render" if IS_RENDER else "local")}',
-                'file_size_mb': str(round(file_size_mb, 2)),
-                'sample_rate': str(self.sample_rate)
-            }
+            upload_metadata = self._upload_metadata(file_size_mb=round(file_size_mb, 2))
             
-            self.s3_client.upload_file(
-                filename, 
-                self.bucket_name, 
+            future = self.uploads.submit(
+                filename,
                 b2_key,
-                ExtraArgs={
-                    'ContentType': 'audio/wav',
-                    'Metadata': upload_metadata
-                }
+                self.encoder.content_type,
+                upload_metadata,
+                delete_after=self._delete_after_upload()
             )
+            print(f"📤 Queued for upload to B2: {b2_key}")
+            return future
             
-            print(f"✅ Successfully uploaded to B2: {b2_key}")
-            
-            # Delete local file to save space (always in GitHub Actions, optional elsewhere)
-            if IS_GITHUB_ACTIONS or IS_RENDER:
-                try:
-                    os.remove(filename)
-                    print(f"🗑️ Local file deleted: {filename}")
-                except Exception as delete_error:
-                    print(f"⚠️ Could not delete local file: {delete_error}")
-            elif not IS_LOCAL:
-                print("🗑️ Deleting local file to save space...")
-                os.remove(filename)
-                print(f"🗑️ Local file deleted: {filename}")
-            else:
-                print("📁 Local file kept for development")
-            
-        except ClientError as e:
-            print(f"❌ B2 upload failed: {e}")
-            print("📁 Recording saved locally only")
         except Exception as e:
             print(f"❌ Upload error: {e}")
             print("📁 Recording saved locally only")
+            return None
     
+    def _b2_key(self, filename):
+        """Path of a recording inside the bucket"""
+        return f"recordings/{os.path.basename(filename)}"
+
+    def _upload_metadata(self, **extra):
+        """Environment metadata attached to every uploaded object"""
+        metadata = {
+            'uploaded_by': f'google-meet-bot-{("github-actions" if IS_GITHUB_ACTIONS else "render" if IS_RENDER else "local")}',
+            'sample_rate': str(self.sample_rate),
+            'codec': self.encoder.codec
+        }
+        metadata.update({key: str(value) for key, value in extra.items()})
+        return metadata
+
+    def _delete_after_upload(self):
+        """Uploaded files are deleted to save space (always in GitHub Actions, optional elsewhere)"""
+        return not IS_LOCAL
+
+    def _cleanup_local_file(self, filename):
+        """Delete an uploaded local file unless running locally"""
+        if self._delete_after_upload():
+            try:
+                os.remove(filename)
+                print(f"🗑️ Local file deleted: {filename}")
+            except Exception as delete_error:
+                print(f"⚠️ Could not delete local file: {delete_error}")
+        else:
+            print("📁 Local file kept for development")
+
     def stop_recording(self):
         """Stop the current recording"""
         if self.is_recording:
@@ -326,6 +945,8 @@ class AudioRecorder:
             # Wait for the recording thread to finish
             if self.record_thread:
                 timeout = 10 if IS_GITHUB_ACTIONS else 3  # Longer timeout in GitHub Actions
+                if self.live_uploader or self.manifest:
+                    timeout = max(timeout, 60)  # Let the tail parts / last segments finish uploading
                 self.record_thread.join(timeout=timeout)
                 
                 if self.record_thread.is_alive():
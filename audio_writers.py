@@ -0,0 +1,298 @@
+import bisect
+import io
+import json
+import os
+import queue
+import struct
+import threading
+import wave
+from datetime import datetime
+
+import numpy as np
+
+
+# Optional: FLAC and Opus encoding need libsndfile through soundfile
+try:
+    import soundfile as sf
+except (ImportError, OSError):
+    sf = None
+
+
+class WavEncoder:
+    """16-bit PCM WAV through the wave module; the header is patched on close"""
+    name = 'wav'
+    extension = 'wav'
+    content_type = 'audio/wav'
+    codec = 'pcm_s16le'
+
+    def __init__(self, filename, sample_rate, channels):
+        self.file = open(filename, 'wb')
+        self.wav = wave.open(self.file, 'wb')
+        self.wav.setnchannels(channels)
+        self.wav.setsampwidth(2)  # 16-bit audio
+        self.wav.setframerate(sample_rate)
+
+    def write(self, chunk):
+        # writeframesraw skips the per-call header patch; close() patches it once
+        self.wav.writeframesraw(chunk)
+
+    def close(self):
+        try:
+            self.wav.close()
+        finally:
+            self.file.close()
+
+
+class SoundFileEncoder:
+    """Base for encoders backed by libsndfile"""
+    name = None
+    extension = None
+    content_type = None
+    codec = None
+    format = None
+    subtype = None
+    sample_rates = None  # None means any rate
+
+    def __init__(self, filename, sample_rate, channels):
+        self.file = sf.SoundFile(
+            filename, 'w',
+            samplerate=sample_rate,
+            channels=channels,
+            format=self.format,
+            subtype=self.subtype
+        )
+
+    def write(self, chunk):
+        self.file.write(chunk)
+
+    def close(self):
+        self.file.close()
+
+
+class FlacEncoder(SoundFileEncoder):
+    """Lossless FLAC, typically 40-60% of the WAV size for speech"""
+    name = 'flac'
+    extension = 'flac'
+    content_type = 'audio/flac'
+    codec = 'flac'
+    format = 'FLAC'
+    subtype = 'PCM_16'
+
+
+class OpusEncoder(SoundFileEncoder):
+    """Speech-friendly Opus in an Ogg container, a small fraction of the WAV size"""
+    name = 'opus'
+    extension = 'ogg'
+    content_type = 'audio/ogg'
+    codec = 'opus'
+    format = 'OGG'
+    subtype = 'OPUS'
+    sample_rates = (8000, 12000, 16000, 24000, 48000)
+
+
+ENCODERS = {
+    'wav': WavEncoder,
+    'flac': FlacEncoder,
+    'opus': OpusEncoder,
+}
+
+
+def get_encoder(name, sample_rate):
+    """Resolve an output format to an encoder class, falling back when it cannot be used"""
+    encoder = ENCODERS.get(name)
+    if encoder is None:
+        print(f"⚠️ Unknown audio format '{name}', using WAV")
+        return WavEncoder
+
+    if issubclass(encoder, SoundFileEncoder):
+        if sf is None:
+            print(f"⚠️ soundfile is not available, cannot encode {encoder.name.upper()} - using WAV")
+            return WavEncoder
+        if encoder.sample_rates and sample_rate not in encoder.sample_rates:
+            print(f"⚠️ {encoder.name.upper()} does not support {sample_rate} Hz - using FLAC")
+            return FlacEncoder
+
+    return encoder
+
+
+class StreamingAudioWriter:
+    """Encode audio chunks to an open file from a background thread.
+
+    Only the chunks waiting in the queue are held in memory, so resident
+    memory stays at a few seconds of audio no matter how long the meeting is.
+    Headers (RIFF sizes, FLAC STREAMINFO) are finalized when the file is closed.
+    """
+    def __init__(self, filename, sample_rate, channels, encoder=WavEncoder, max_queued_chunks=4):
+        self.filename = filename
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.frames_written = 0
+        self.error = None
+        self.closed = False
+        self.queue = queue.Queue(maxsize=max_queued_chunks)
+
+        self.encoder = encoder(filename, sample_rate, channels)
+
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def write(self, chunk):
+        """Queue a chunk for encoding; only blocks if the encoder falls behind"""
+        self.queue.put(chunk)
+
+    def close(self):
+        """Encode queued chunks, finalize the header and close the file"""
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.put(None)
+        self.thread.join()
+
+    def _run(self):
+        while True:
+            chunk = self.queue.get()
+            if chunk is None:
+                break
+            if self.error:
+                continue  # Keep draining so producers never block on a dead writer
+            try:
+                self.encoder.write(chunk)
+                self.frames_written += len(chunk)
+            except Exception as e:
+                print(f"❌ Streaming writer error: {e}")
+                self.error = e
+
+        try:
+            self.encoder.close()
+        except Exception as e:
+            print(f"❌ Could not finalize {self.filename}: {e}")
+            self.error = self.error or e
+
+
+def wav_header(sample_rate, channels, num_frames, sample_width=2):
+    """Build the 44-byte PCM WAV header for a known number of frames"""
+    block_align = channels * sample_width
+    data_size = num_frames * block_align
+    return struct.pack(
+        '<4sI4s4sIHHIIHH4sI',
+        b'RIFF', 36 + data_size, b'WAVE',
+        b'fmt ', 16, 1, channels, sample_rate, sample_rate * block_align, block_align, sample_width * 8,
+        b'data', data_size
+    )
+
+
+class WavChunkReader(io.RawIOBase):
+    """Read-only, seekable file object serving a WAV built from in-memory chunks.
+
+    The header is synthesized and the audio is read through memoryviews over
+    the original numpy chunks, so no concatenated or serialized copy of the
+    recording is ever made.
+    """
+    def __init__(self, chunks, sample_rate, channels):
+        if isinstance(chunks, np.ndarray):
+            chunks = [chunks]
+        num_frames = sum(len(chunk) for chunk in chunks)
+
+        self.views = [memoryview(wav_header(sample_rate, channels, num_frames))]
+        self.views += [memoryview(np.ascontiguousarray(chunk).reshape(-1).view(np.uint8)) for chunk in chunks]
+
+        # Start offset of every view, for bisecting on seek
+        self.offsets = []
+        total = 0
+        for view in self.views:
+            self.offsets.append(total)
+            total += len(view)
+        self.size = total
+        self.position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self.position
+        elif whence == io.SEEK_END:
+            offset += self.size
+        if offset < 0:
+            raise ValueError("negative seek position")
+        self.position = offset
+        return self.position
+
+    def readinto(self, buffer):
+        target = memoryview(buffer).cast('B')
+        copied = 0
+        index = bisect.bisect_right(self.offsets, self.position) - 1
+
+        while copied < len(target) and self.position < self.size:
+            view = self.views[index]
+            start = self.position - self.offsets[index]
+            count = min(len(view) - start, len(target) - copied)
+            target[copied:copied + count] = view[start:start + count]
+            copied += count
+            self.position += count
+            index += 1
+
+        return copied
+
+
+class SegmentManifest:
+    """Index of the segments a recording is split into.
+
+    Rewritten atomically after every finalized segment, so a recording that is
+    killed mid-meeting still has a manifest describing every complete segment.
+    """
+    def __init__(self, filename, sample_rate, channels, encoder, segment_minutes, started_at):
+        self.filename = filename
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.encoder = encoder
+        self.segment_minutes = segment_minutes
+        self.started_at = started_at
+        self.segments = []
+        self.complete = False
+
+    @property
+    def total_frames(self):
+        return sum(segment['frames'] for segment in self.segments)
+
+    def add_segment(self, filename, frames, size_bytes, b2_key):
+        """Record a finalized segment; its start is the end of the previous one"""
+        segment = {
+            'index': len(self.segments) + 1,
+            'filename': os.path.basename(filename),
+            'b2_key': b2_key,
+            'start_seconds': round(self.total_frames / self.sample_rate, 3),
+            'duration_seconds': round(frames / self.sample_rate, 3),
+            'frames': frames,
+            'size_bytes': size_bytes,
+            'finalized_at': datetime.now().isoformat()
+        }
+        self.segments.append(segment)
+        return segment
+
+    def to_dict(self):
+        return {
+            'recording': os.path.basename(self.filename),
+            'started_at': datetime.fromtimestamp(self.started_at).isoformat(),
+            'sample_rate': self.sample_rate,
+            'channels': self.channels,
+            'codec': self.encoder.codec,
+            'content_type': self.encoder.content_type,
+            'segment_minutes': self.segment_minutes,
+            'total_seconds': round(self.total_frames / self.sample_rate, 3),
+            'complete': self.complete,
+            'segments': self.segments
+        }
+
+    def save(self):
+        """Write the manifest via a temp file so readers never see a partial one"""
+        temp_filename = f"{self.filename}.tmp"
+        with open(temp_filename, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(temp_filename, self.filename)
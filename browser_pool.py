@@ -0,0 +1,405 @@
+import atexit
+import fcntl
+import json
+import os
+import tempfile
+import threading
+import time
+
+import chromedriver_autoinstaller
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+
+from process_stats import tree_rss_mb
+from pulse_audio import create_session_sink
+
+# Environment detection
+IS_GITHUB_ACTIONS = os.environ.get('GITHUB_ACTIONS') == 'true'
+
+# Browsers kept launched and idle, ready for the next join
+BROWSER_POOL_SIZE = int(os.environ.get('BROWSER_POOL_SIZE', '1'))
+# Relaunch a browser after this many meetings...
+BROWSER_MAX_USES = int(os.environ.get('BROWSER_MAX_USES', '5'))
+# ...or once Chrome and its helpers hold this much memory
+BROWSER_MAX_RSS_MB = float(os.environ.get('BROWSER_MAX_RSS_MB', '1500'))
+
+# Persistent Chrome profiles, one per concurrently running browser, kept across runs
+CHROME_PROFILE_DIR = os.environ.get('CHROME_PROFILE_DIR', 'chrome_profiles')
+# Google cookies exported after sign-in, to seed profile slots that start empty
+GOOGLE_COOKIE_JAR = os.environ.get('GOOGLE_COOKIE_JAR', os.path.join(CHROME_PROFILE_DIR, 'google_cookies.json'))
+# The jar is a live Google session. CI runners could only keep it through caches
+# that pull-request runs can read, so on CI the bot logs in every run instead.
+USE_COOKIE_JAR = not IS_GITHUB_ACTIONS
+
+# Cookies whose presence means the profile holds a Google sign-in
+GOOGLE_SESSION_COOKIES = ('SID', '__Secure-1PSID', '__Secure-3PSID')
+
+# Strip the browser down to what recording meeting audio needs: no images,
+# fonts or video rendering, a small window, fewer background services
+AUDIO_ONLY_BROWSER = os.environ.get('AUDIO_ONLY_BROWSER', 'true') == 'true'
+
+# Requests refused in audio-only browsers (Network.setBlockedURLs patterns)
+BLOCKED_URL_PATTERNS = [
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.ico', '*.svg',
+    '*.woff', '*.woff2', '*.ttf', '*.otf',
+    '*://lh3.googleusercontent.com/*',  # Participant avatars
+    '*://fonts.gstatic.com/*'
+]
+
+# Runs in every document of an audio-only browser: hides and pauses every
+# <video>, so participants' camera streams are not rendered or composited.
+# Meet plays call audio through separate <audio> elements, which are untouched.
+HIDE_VIDEO_SCRIPT = """
+(() => {
+    const pause = (root) => root.querySelectorAll && root.querySelectorAll('video').forEach(video => {
+        if (!video.paused) video.pause();
+    });
+    const start = () => {
+        const style = document.createElement('style');
+        style.textContent = 'video { display: none !important; }';
+        document.documentElement.appendChild(style);
+        pause(document);
+        new MutationObserver(mutations => {
+            for (const mutation of mutations) mutation.addedNodes.forEach(node => {
+                if (node.nodeName === 'VIDEO') node.pause(); else pause(node);
+            });
+        }).observe(document.documentElement, {childList: true, subtree: true});
+        document.addEventListener('play', event => {
+            if (event.target.nodeName === 'VIDEO') event.target.pause();
+        }, true);
+    };
+    if (document.documentElement) start(); else document.addEventListener('DOMContentLoaded', start);
+})();
+"""
+
+# Fields of a CDP cookie that Network.setCookies accepts back
+COOKIE_FIELDS = ('name', 'value', 'domain', 'path', 'secure', 'httpOnly', 'sameSite', 'expires')
+
+_driver_installed = False
+_install_lock = threading.Lock()
+
+
+def build_chrome_options(profile_dir=None, audio_only=AUDIO_ONLY_BROWSER):
+    chrome_options = Options()
+    # Chrome honours only the last --disable-features, so they are collected here
+    disabled_features = []
+
+    if profile_dir:
+        chrome_options.add_argument(f"--user-data-dir={os.path.abspath(profile_dir)}")
+
+    # Base Chrome options for headless operation
+    chrome_options.add_argument("--headless=new")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-gpu")
+
+    # GitHub Actions specific optimizations
+    if IS_GITHUB_ACTIONS:
+        chrome_options.add_argument("--disable-web-security")
+        disabled_features.append("VizDisplayCompositor")
+        chrome_options.add_argument("--single-process")
+        chrome_options.add_argument("--disable-background-timer-throttling")
+        chrome_options.add_argument("--disable-renderer-backgrounding")
+        chrome_options.add_argument("--disable-backgrounding-occluded-windows")
+        chrome_options.add_argument("--disable-extensions")
+        chrome_options.add_argument("--memory-pressure-off")
+        chrome_options.add_argument("--max_old_space_size=4096")
+    else:
+        # Port 0 lets Chrome pick a free port, so parallel sessions do not collide
+        chrome_options.add_argument("--remote-debugging-port=0")
+
+    # Audio-only: the smallest window Meet still lays out, no images, and none of
+    # the background services a recording bot never uses. Audio output must stay
+    # on (no --mute-audio): it is what the session's sink records.
+    if audio_only:
+        chrome_options.add_argument("--window-size=640,360")
+        chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+        chrome_options.add_argument("--disable-extensions")
+        chrome_options.add_argument("--disable-background-networking")
+        chrome_options.add_argument("--disable-component-update")
+        chrome_options.add_argument("--disable-default-apps")
+        chrome_options.add_argument("--disable-sync")
+        chrome_options.add_argument("--disable-client-side-phishing-detection")
+        chrome_options.add_argument("--metrics-recording-only")
+        chrome_options.add_argument("--no-first-run")
+        disabled_features += ["Translate", "MediaRouter", "OptimizationHints", "AutofillServerCommunication", "InterestFeedContentSuggestions"]
+
+    if disabled_features:
+        chrome_options.add_argument(f"--disable-features={','.join(disabled_features)}")
+
+    # Media and automation options
+    chrome_options.add_argument("--use-fake-ui-for-media-stream")
+    # Lets the in-page audio capture start its AudioContext without a user gesture
+    chrome_options.add_argument("--autoplay-policy=no-user-gesture-required")
+    chrome_options.add_argument("--disable-notifications")
+    chrome_options.add_argument("--disable-blink-features=AutomationControlled")
+    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    chrome_options.add_experimental_option('useAutomationExtension', False)
+    chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+    return chrome_options
+
+
+def apply_audio_only(driver):
+    """Block images/fonts and video rendering for every page this browser opens"""
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URL_PATTERNS})
+        driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': HIDE_VIDEO_SCRIPT})
+    except Exception as e:
+        print(f"⚠️ Could not apply the audio-only browser profile: {e}")
+
+
+def _lock_profile_dir():
+    """Claim the first profile directory no other running browser is using.
+
+    Chrome refuses to share a user-data-dir, so each browser takes an
+    exclusive lock on its profile for as long as it runs. Returns the
+    directory and the open lock file (closing it releases the claim).
+    """
+    index = 1
+    while True:
+        profile_dir = os.path.join(CHROME_PROFILE_DIR, f"profile-{index}")
+        os.makedirs(profile_dir, exist_ok=True)
+        lock_file = open(os.path.join(profile_dir, '.bot.lock'), 'w')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return profile_dir, lock_file
+        except OSError:
+            lock_file.close()
+            index += 1
+
+
+def _install_chromedriver():
+    """Download/locate chromedriver once per process instead of once per join"""
+    global _driver_installed
+    with _install_lock:
+        if not _driver_installed:
+            chromedriver_autoinstaller.install()
+            _driver_installed = True
+
+
+class PooledBrowser:
+    """A launched Chrome with its own audio sink and persistent profile, reused across meetings"""
+    def __init__(self, slot):
+        self.slot = slot
+        self.uses = 0
+        self.created_at = time.time()
+        self.profile_dir, self.profile_lock = _lock_profile_dir()
+
+        # Chrome's audio goes to this browser's own sink for its whole life
+        self.sink = create_session_sink(f"browser{slot}")
+        service = Service(env=self.sink.browser_env()) if self.sink else Service()
+        try:
+            self.driver = webdriver.Chrome(options=build_chrome_options(self.profile_dir), service=service)
+        except Exception:
+            if self.sink:
+                self.sink.remove()
+            self.profile_lock.close()
+            raise
+
+        if AUDIO_ONLY_BROWSER:
+            apply_audio_only(self.driver)
+
+        if not self.has_google_session():
+            self.load_google_session()
+
+    @property
+    def rss_mb(self):
+        """Memory held by chromedriver, Chrome and every Chrome helper process"""
+        try:
+            return tree_rss_mb(self.driver.service.process.pid)
+        except Exception:
+            return 0.0
+
+    def is_healthy(self):
+        try:
+            self.driver.execute_script("return 1")
+            return len(self.driver.window_handles) > 0
+        except Exception:
+            return False
+
+    def reset(self):
+        """Close what the last meeting left open; cookies stay so the sign-in survives"""
+        handles = self.driver.window_handles
+        for handle in handles[1:]:
+            self.driver.switch_to.window(handle)
+            self.driver.close()
+        self.driver.switch_to.window(handles[0])
+        self.driver.get("about:blank")
+
+    def has_google_session(self):
+        """Fast signed-in probe: looks for Google session cookies without loading a page"""
+        try:
+            cookies = self.driver.execute_cdp_cmd('Network.getAllCookies', {})['cookies']
+        except Exception:
+            return False
+        return any(
+            cookie['name'] in GOOGLE_SESSION_COOKIES and cookie['domain'].endswith('google.com')
+            for cookie in cookies
+        )
+
+    def save_google_session(self):
+        """Export Google cookies to the cookie jar so other profiles and runs can reuse them"""
+        if not USE_COOKIE_JAR:
+            return
+        temp_file = None
+        try:
+            cookies = self.driver.execute_cdp_cmd('Network.getAllCookies', {})['cookies']
+            cookies = [cookie for cookie in cookies if cookie['domain'].endswith('google.com')]
+            jar_dir = os.path.dirname(GOOGLE_COOKIE_JAR) or '.'
+            os.makedirs(jar_dir, exist_ok=True)
+            # Own temp file per writer, as session workers save in parallel;
+            # mkstemp creates it owner read/write only (the cookies are credentials)
+            fd, temp_file = tempfile.mkstemp(prefix='.google_cookies.', suffix='.tmp', dir=jar_dir)
+            with os.fdopen(fd, 'w') as f:
+                json.dump(cookies, f)
+            os.replace(temp_file, GOOGLE_COOKIE_JAR)
+            temp_file = None
+        except Exception as e:
+            print(f"⚠️ Could not save Google session: {e}")
+        finally:
+            if temp_file:
+                try:
+                    os.remove(temp_file)
+                except OSError:
+                    pass
+
+    def load_google_session(self):
+        """Seed an empty profile with the cookies from the jar"""
+        if not USE_COOKIE_JAR or not os.path.exists(GOOGLE_COOKIE_JAR):
+            return
+        try:
+            with open(GOOGLE_COOKIE_JAR) as f:
+                cookies = json.load(f)
+            now = time.time()
+            cookies = [
+                {key: cookie[key] for key in COOKIE_FIELDS if key in cookie and not (key == 'expires' and cookie.get('session'))}
+                for cookie in cookies
+                if cookie.get('session') or cookie.get('expires', 0) > now
+            ]
+            self.driver.execute_cdp_cmd('Network.setCookies', {'cookies': cookies})
+            print(f"🍪 Loaded {len(cookies)} Google cookies into {self.profile_dir}")
+        except Exception as e:
+            print(f"⚠️ Could not load Google session: {e}")
+
+    def quit(self):
+        try:
+            self.driver.quit()
+        except Exception as e:
+            print(f"⚠️ Error closing browser {self.slot}: {e}")
+        if self.sink:
+            self.sink.remove()
+        self.profile_lock.close()
+
+
+class BrowserPool:
+    """Headless Chrome sessions launched ahead of time and handed out per meeting.
+
+    A join takes an idle browser instead of paying for chromedriver setup and
+    a Chrome launch. Returned browsers are reset and reused until they reach
+    `max_uses` meetings or `max_rss_mb` of memory, then replaced in the
+    background so a warm browser is ready for the next join.
+    """
+    def __init__(self, size=BROWSER_POOL_SIZE, max_uses=BROWSER_MAX_USES, max_rss_mb=BROWSER_MAX_RSS_MB):
+        self.size = size
+        self.max_uses = max_uses
+        self.max_rss_mb = max_rss_mb
+        self.idle = []
+        self.lock = threading.Lock()
+        self.slots = 0
+
+    def warm_up(self):
+        """Launch browsers until `size` are idle"""
+        while True:
+            with self.lock:
+                if len(self.idle) >= self.size:
+                    return
+            browser = self._launch()
+            if browser is None:
+                return
+            with self.lock:
+                self.idle.append(browser)
+
+    def acquire(self):
+        """An idle healthy browser, or a freshly launched one if none is ready"""
+        while True:
+            with self.lock:
+                browser = self.idle.pop() if self.idle else None
+            if browser is None:
+                break
+            if browser.is_healthy():
+                browser.uses += 1
+                print(f"♻️ Using warm browser {browser.slot} (use {browser.uses}/{self.max_uses})")
+                return browser
+            print(f"⚠️ Browser {browser.slot} is unresponsive, discarding it")
+            browser.quit()
+
+        print("🚀 No warm browser available, launching one...")
+        browser = self._launch()
+        if browser is None:
+            raise RuntimeError("Could not launch Chrome")
+        browser.uses += 1
+        return browser
+
+    def release(self, browser, healthy=True):
+        """Return a browser after a meeting; recycles it when worn out or broken"""
+        rss = browser.rss_mb
+        reason = None
+        if not healthy or not browser.is_healthy():
+            reason = "session failed"
+        elif browser.uses >= self.max_uses:
+            reason = f"{browser.uses} uses"
+        elif rss > self.max_rss_mb:
+            reason = f"{rss:.0f} MB RSS"
+
+        if reason is None:
+            try:
+                browser.reset()
+            except Exception as e:
+                reason = f"reset failed: {e}"
+
+        if reason:
+            print(f"🔄 Recycling browser {browser.slot} ({reason})")
+            browser.quit()
+            # Relaunch off the caller's thread so finishing a meeting is not delayed
+            threading.Thread(target=self.warm_up, daemon=True).start()
+            return
+
+        with self.lock:
+            self.idle.append(browser)
+        print(f"✅ Browser {browser.slot} back in the pool ({rss:.0f} MB RSS)")
+
+    def close(self):
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for browser in idle:
+            browser.quit()
+
+    def _launch(self):
+        try:
+            _install_chromedriver()
+            with self.lock:
+                self.slots += 1
+                slot = self.slots
+            started = time.time()
+            browser = PooledBrowser(slot)
+            print(f"🌐 Browser {slot} launched in {time.time() - started:.1f}s")
+            return browser
+        except Exception as e:
+            print(f"❌ Could not launch browser: {e}")
+            return None
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool():
+    """Process-wide browser pool, created on first use and closed at exit"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool()
+            atexit.register(_pool.close)
+        return _pool
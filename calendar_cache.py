@@ -0,0 +1,315 @@
+import datetime
+import json
+import os
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+# Where synced events and the sync token are kept between polls
+CACHE_FILE = os.environ.get('CALENDAR_CACHE_FILE', 'calendar_cache.json')
+
+# How far back the initial full sync reaches; later polls only fetch changes
+FULL_SYNC_LOOKBACK_HOURS = 12
+
+# Rebuild from scratch now and then so events that ended long ago drop out
+FULL_SYNC_MAX_AGE_HOURS = 24
+
+
+def cache_file_for(calendar_id):
+    """Cache file for a calendar: CACHE_FILE for primary, a suffixed sibling for the rest"""
+    if calendar_id == 'primary':
+        return CACHE_FILE
+    root, extension = os.path.splitext(CACHE_FILE)
+    slug = ''.join(c if c.isalnum() else '_' for c in calendar_id)
+    return f"{root}_{slug}{extension}"
+
+
+def _event_time(value):
+    if 'dateTime' in value:
+        parsed = datetime.datetime.fromisoformat(value['dateTime'].replace('Z', '+00:00'))
+    else:
+        parsed = datetime.datetime.fromisoformat(value['date'])
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+    return parsed.astimezone(datetime.timezone.utc)
+
+
+def event_start(event):
+    """Start of an event as an aware UTC datetime (all-day events start at midnight UTC)"""
+    return _event_time(event.get('start', {}))
+
+
+def event_end(event):
+    """End of an event as an aware UTC datetime, or its start if it has none"""
+    if 'end' in event:
+        return _event_time(event['end'])
+    return event_start(event)
+
+
+def _utc_now():
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+def _rfc3339(value):
+    return value.astimezone(datetime.timezone.utc).isoformat().replace('+00:00', 'Z')
+
+
+class CalendarEventCache:
+    """Local copy of one calendar, kept current with Calendar API incremental sync.
+
+    The first poll lists every event from a little in the past onwards and
+    stores the `nextSyncToken` the API returns. Every later poll sends only
+    that token and gets back just the events created, changed or cancelled
+    since, so an unchanged calendar costs one near-empty response no matter
+    how far ahead the bot looks.
+    """
+    def __init__(self, cache_file=CACHE_FILE, calendar_id='primary'):
+        self.cache_file = cache_file
+        self.calendar_id = calendar_id
+        self.events = {}        # event id -> event resource
+        self.sync_token = None
+        self.full_sync_at = None
+        self._load()
+
+    def sync(self, service):
+        """Bring the cache up to date; returns False if the API could not be reached"""
+        try:
+            if self.sync_token and not self._full_sync_due():
+                try:
+                    changed = self._incremental_sync(service)
+                    print(f"🔄 Calendar incremental sync ({self.calendar_id}): {changed} changed events")
+                except HttpError as e:
+                    if e.resp.status != 410:
+                        raise
+                    # Token expired or invalidated server-side; start over
+                    print(f"⚠️ Calendar sync token expired ({self.calendar_id}), running a full sync")
+                    self._full_sync(service)
+            else:
+                self._full_sync(service)
+            self._save()
+            return True
+        except Exception as e:
+            print(f"❌ Calendar sync failed ({self.calendar_id}), using {len(self.events)} cached events: {e}")
+            return False
+
+    def upcoming(self, time_min, time_max):
+        """Cached events overlapping [time_min, time_max), ordered by start time.
+
+        Like the API's timeMin/timeMax, this keeps events that have already
+        started but not yet ended.
+        """
+        events = []
+        for event in self.events.values():
+            try:
+                start = event_start(event)
+                end = event_end(event)
+            except Exception:
+                continue
+            if start < time_max and end > time_min:
+                events.append((start, event))
+        events.sort(key=lambda item: item[0])
+        return [event for _, event in events]
+
+    def _full_sync(self, service):
+        time_min = _utc_now() - datetime.timedelta(hours=FULL_SYNC_LOOKBACK_HOURS)
+        events, sync_token = self._list_all(service, timeMin=_rfc3339(time_min))
+
+        self.events = {}
+        self._apply(events)
+        self.sync_token = sync_token
+        self.full_sync_at = _utc_now()
+        print(f"📥 Calendar full sync ({self.calendar_id}): {len(self.events)} events cached")
+
+    def _incremental_sync(self, service):
+        events, sync_token = self._list_all(service, syncToken=self.sync_token)
+        self._apply(events)
+        self.sync_token = sync_token
+        return len(events)
+
+    def _list_all(self, service, **params):
+        """Page through events().list; the sync token arrives with the last page"""
+        events = []
+        page_token = None
+        while True:
+            # orderBy, timeMax and friends are not allowed with sync tokens, and
+            # singleEvents must match between the full and incremental requests
+            response = service.events().list(
+                calendarId=self.calendar_id,
+                singleEvents=True,
+                maxResults=250,
+                pageToken=page_token,
+                **params
+            ).execute()
+            events.extend(response.get('items', []))
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                return events, response.get('nextSyncToken')
+
+    def _apply(self, events):
+        for event in events:
+            if event.get('status') == 'cancelled':
+                self.events.pop(event['id'], None)
+            else:
+                self.events[event['id']] = event
+
+    def _full_sync_due(self):
+        if self.full_sync_at is None:
+            return True
+        return _utc_now() - self.full_sync_at > datetime.timedelta(hours=FULL_SYNC_MAX_AGE_HOURS)
+
+    def _load(self):
+        if not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file) as f:
+                data = json.load(f)
+            if data.get('calendar_id') != self.calendar_id:
+                return
+            self.events = data.get('events', {})
+            self.sync_token = data.get('sync_token')
+            if data.get('full_sync_at'):
+                self.full_sync_at = datetime.datetime.fromisoformat(data['full_sync_at'])
+        except Exception as e:
+            print(f"⚠️ Could not read calendar cache {self.cache_file}: {e}")
+
+    def _save(self):
+        """Rewrite the cache via a temp file so a killed run never leaves half a file"""
+        try:
+            os.makedirs(os.path.dirname(self.cache_file) or '.', exist_ok=True)
+            temp_file = f"{self.cache_file}.tmp"
+            with open(temp_file, 'w') as f:
+                json.dump({
+                    'calendar_id': self.calendar_id,
+                    'sync_token': self.sync_token,
+                    'full_sync_at': self.full_sync_at.isoformat() if self.full_sync_at else None,
+                    'events': self.events
+                }, f)
+            os.replace(temp_file, self.cache_file)
+        except Exception as e:
+            print(f"⚠️ Could not save calendar cache: {e}")
+
+
+class FakeCalendarService:
+    """In-memory stand-in for the Calendar API service, for exercising sync offline.
+
+    Supports the subset of `events().list` the cache uses: paging, `timeMin`
+    on full syncs, and `syncToken` deltas including cancelled events and a
+    410 when a token has been invalidated.
+    """
+    def __init__(self, page_size=2):
+        self.page_size = page_size
+        self.version = 0
+        self.items = {}        # event id -> (event, version it last changed at)
+        self.expired_tokens = set()
+        self.requests = []
+
+    def put_event(self, event_id, summary, start, status='confirmed'):
+        self.version += 1
+        event = {
+            'id': event_id,
+            'status': status,
+            'summary': summary,
+            'start': {'dateTime': _rfc3339(start)},
+            'end': {'dateTime': _rfc3339(start + datetime.timedelta(minutes=30))},
+            'hangoutLink': f"https://meet.google.com/{event_id}"
+        }
+        self.items[event_id] = (event, self.version)
+
+    def cancel_event(self, event_id):
+        self.version += 1
+        self.items[event_id] = ({'id': event_id, 'status': 'cancelled'}, self.version)
+
+    def expire_token(self, token):
+        self.expired_tokens.add(token)
+
+    def events(self):
+        return self
+
+    def list(self, calendarId, pageToken=None, syncToken=None, timeMin=None, maxResults=250, **kwargs):
+        self.requests.append({'syncToken': syncToken, 'timeMin': timeMin, 'pageToken': pageToken})
+        return _FakeRequest(self, syncToken, timeMin, pageToken)
+
+    def _execute(self, sync_token, time_min, page_token):
+        if sync_token in self.expired_tokens:
+            raise HttpError(httplib2.Response({'status': 410}), b'{"error": "fullSyncRequired"}')
+
+        if sync_token:
+            since = int(sync_token.split('-')[1])
+            matches = [event for event, version in self.items.values() if version > since]
+        else:
+            lower = datetime.datetime.fromisoformat(time_min.replace('Z', '+00:00'))
+            matches = [
+                event for event, _ in self.items.values()
+                if event['status'] != 'cancelled' and event_end(event) > lower
+            ]
+
+        offset = int(page_token or 0)
+        page = matches[offset:offset + self.page_size]
+        response = {'items': page}
+        if offset + self.page_size < len(matches):
+            response['nextPageToken'] = str(offset + self.page_size)
+        else:
+            response['nextSyncToken'] = f"sync-{self.version}"
+        return response
+
+
+class _FakeRequest:
+    def __init__(self, service, sync_token, time_min, page_token):
+        self.args = (sync_token, time_min, page_token)
+        self.service = service
+
+    def execute(self):
+        return self.service._execute(*self.args)
+
+
+def test_incremental_sync(cache_file='calendar_cache_test.json'):
+    """Run the cache against the fake service: full sync, deltas, cancellation, 410 recovery"""
+    print("🧪 Testing calendar cache incremental sync...")
+    if os.path.exists(cache_file):
+        os.remove(cache_file)
+
+    now = _utc_now()
+    service = FakeCalendarService()
+    service.put_event('standup', 'Standup', now + datetime.timedelta(minutes=30))
+    service.put_event('review', 'Review', now + datetime.timedelta(hours=3))
+    service.put_event('planning', 'Planning', now + datetime.timedelta(days=3))
+    service.put_event('old', 'Old', now - datetime.timedelta(days=2))
+
+    try:
+        cache = CalendarEventCache(cache_file)
+        assert cache.sync(service)
+        assert sorted(cache.events) == ['planning', 'review', 'standup'], cache.events
+        assert service.requests[0]['timeMin'] and not service.requests[0]['syncToken']
+
+        # A second poll with no changes is a single incremental request
+        request_count = len(service.requests)
+        cache = CalendarEventCache(cache_file)  # Reload from disk, as the next cron run would
+        assert cache.sync(service)
+        assert len(service.requests) == request_count + 1
+        assert service.requests[-1]['syncToken']
+
+        # Edits and cancellations arrive as deltas
+        service.put_event('review', 'Review (moved)', now + datetime.timedelta(hours=1))
+        service.cancel_event('standup')
+        assert cache.sync(service)
+        assert 'standup' not in cache.events
+        assert cache.events['review']['summary'] == 'Review (moved)'
+        upcoming = cache.upcoming(now, now + datetime.timedelta(hours=24))
+        assert [event['id'] for event in upcoming] == ['review'], upcoming
+
+        # An invalidated token falls back to a full sync
+        service.expire_token(cache.sync_token)
+        service.put_event('retro', 'Retro', now + datetime.timedelta(hours=2))
+        assert cache.sync(service)
+        assert sorted(cache.events) == ['planning', 'retro', 'review'], cache.events
+
+        print("✅ Calendar cache test passed!")
+        return True
+    finally:
+        if os.path.exists(cache_file):
+            os.remove(cache_file)
+
+
+if __name__ == '__main__':
+    if not test_incremental_sync():
+        exit(1)
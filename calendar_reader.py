@@ -1,10 +1,17 @@
 import os.path
 import datetime
+import heapq
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import google_auth_httplib2
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
+from googleapiclient.http import HttpRequest, build_http
+from calendar_cache import CalendarEventCache, cache_file_for, event_start
+from schedule_index import ScheduleIndex, meeting_link
 
 SCOPES = ['https://www.googleapis.com/auth/calendar.readonly']
 
@@ -13,18 +20,22 @@ IS_GITHUB_ACTIONS = os.environ.get('GITHUB_ACTIONS') == 'true'
 IS_RENDER = os.environ.get('RENDER') == 'true'
 IS_LOCAL = not (IS_GITHUB_ACTIONS or IS_RENDER)
 
-def get_calendar_service():
-    print("🔍 Attempting to get calendar service...")
-    
-    if IS_GITHUB_ACTIONS:
-        print("🔧 Running in GitHub Actions environment")
-    elif IS_RENDER:
-        print("🔧 Running in Render environment")
-    else:
-        print("🔧 Running in local environment")
-    
-    creds = None
-    
+# Calendars to watch: comma-separated ids of shared/team calendars, 'primary' for the bot's own
+CALENDAR_IDS = [c.strip() for c in os.environ.get('CALENDAR_IDS', 'primary').split(',') if c.strip()]
+
+# Upper bound on concurrent calendar syncs
+CALENDAR_SYNC_WORKERS = int(os.environ.get('CALENDAR_SYNC_WORKERS', '8'))
+
+# Sync threads live as long as the process, so their connections are reused between polls
+_sync_executor = None
+_sync_executor_lock = threading.Lock()
+
+# Built services, keyed by token file; reused until the token file changes
+_services = {}
+_services_lock = threading.Lock()
+
+def _credential_paths():
+    """Resolve where credentials.json and token.json live in this environment"""
     # Environment-specific credential paths
     if IS_RENDER:
         # Render's secret file location
@@ -54,6 +65,55 @@ def get_calendar_service():
             token_path = backup_token
             print(f"🔍 Using fallback token: {token_path}")
     
+    return credentials_path, token_path
+
+def _token_mtime(token_path):
+    try:
+        return os.path.getmtime(token_path)
+    except OSError:
+        return None
+
+def _thread_safe_request_builder(creds):
+    """Request builder giving every thread its own authorized HTTP connection.
+
+    httplib2 connections are not thread-safe, so a service shared by the
+    calendar sync threads must not send every request through one Http.
+    build_http() applies the client library's default socket timeout, so a
+    stuck request fails instead of blocking the scheduler.
+    """
+    local = threading.local()
+    
+    def build_request(http, *args, **kwargs):
+        if not hasattr(local, 'http'):
+            local.http = google_auth_httplib2.AuthorizedHttp(creds, http=build_http())
+        return HttpRequest(local.http, *args, **kwargs)
+    
+    return build_request
+
+def get_calendar_service():
+    """
+    Calendar service for the stored token, built once per process.
+    The service's authorized HTTP refreshes the access token on its own when
+    it expires, so later calls return the cached service straight away.
+    """
+    credentials_path, token_path = _credential_paths()
+    
+    with _services_lock:
+        cached = _services.get(token_path)
+        if cached and cached['mtime'] == _token_mtime(token_path):
+            return cached['service']
+    
+    print("🔍 Attempting to get calendar service...")
+    
+    if IS_GITHUB_ACTIONS:
+        print("🔧 Running in GitHub Actions environment")
+    elif IS_RENDER:
+        print("🔧 Running in Render environment")
+    else:
+        print("🔧 Running in local environment")
+    
+    creds = None
+    
     # Load existing token with detailed debugging
     if os.path.exists(token_path):
         print("🔍 Loading existing token...")
@@ -131,17 +191,60 @@ def get_calendar_service():
     
     try:
         print("🔍 Building calendar service...")
-        service = build('calendar', 'v3', credentials=creds)
+        # Bundled discovery document: no network fetch, and no file cache to warn about
+        service = build(
+            'calendar', 'v3',
+            credentials=creds,
+            static_discovery=True,
+            cache_discovery=False,
+            requestBuilder=_thread_safe_request_builder(creds)
+        )
         print("✅ Calendar service built successfully")
+        
+        with _services_lock:
+            _services[token_path] = {'service': service, 'mtime': _token_mtime(token_path)}
         return service
     except Exception as e:
         print(f"❌ Error building calendar service: {e}")
         return None
 
+def _get_sync_executor():
+    global _sync_executor
+    with _sync_executor_lock:
+        if _sync_executor is None:
+            workers = max(1, min(CALENDAR_SYNC_WORKERS, len(CALENDAR_IDS)))
+            _sync_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='calendar-sync')
+        return _sync_executor
+
+def _sync_calendars(service):
+    """Sync every watched calendar's cache concurrently; returns the caches in CALENDAR_IDS order"""
+    caches = [CalendarEventCache(cache_file_for(calendar_id), calendar_id) for calendar_id in CALENDAR_IDS]
+    if len(caches) == 1:
+        # Nothing to overlap; the calling thread keeps its own connection
+        results = [caches[0].sync(service)]
+    else:
+        results = list(_get_sync_executor().map(lambda cache: cache.sync(service), caches))
+    print(f"🔍 Synced {sum(results)}/{len(caches)} calendars")
+    return caches
+
+def _merge_calendars(caches, time_min, time_max):
+    """Merge per-calendar event lists into one start-ordered stream, once per event"""
+    seen = set()
+    events = []
+    streams = [cache.upcoming(time_min, time_max) for cache in caches]
+    for event in heapq.merge(*streams, key=event_start):
+        # The same meeting shows up in every calendar it was sent to
+        key = (event.get('iCalUID', event['id']), event['start'].get('dateTime', event['start'].get('date')))
+        if key in seen:
+            continue
+        seen.add(key)
+        events.append(event)
+    return events
+
 def get_upcoming_meetings():
     """
-    Get upcoming Google Meet meetings from the calendar
-    Returns list of meetings with Google Meet links
+    Get upcoming Google Meet meetings from the watched calendars
+    Returns list of meetings with Google Meet links, ordered by start time
     """
     print("🔍 Starting get_upcoming_meetings function...")
     
@@ -157,36 +260,31 @@ def get_upcoming_meetings():
     if IS_GITHUB_ACTIONS:
         # GitHub Actions: Look ahead only 4 hours (since it runs frequently)
         time_max = (datetime.datetime.utcnow() + datetime.timedelta(hours=4)).isoformat() + 'Z'
-        max_results = 5  # Fewer results for faster processing
     else:
         # Other environments: Look ahead 24 hours
         time_max = (datetime.datetime.utcnow() + datetime.timedelta(hours=24)).isoformat() + 'Z'
-        max_results = 10
     
     try:
-        print("🔍 Making API call to Google Calendar...")
+        print(f"🔍 Syncing {len(CALENDAR_IDS)} calendars with Google Calendar: {', '.join(CALENDAR_IDS)}")
         print(f"🔍 Time window: {now} to {time_max}")
         
-        events_result = service.events().list(
-            calendarId='primary', 
-            timeMin=now,
-            timeMax=time_max,
-            maxResults=max_results, 
-            singleEvents=True,
-            orderBy='startTime'
-        ).execute()
-        print("✅ API call successful")
+        # Only changes since the last poll are fetched; the window is applied locally
+        caches = _sync_calendars(service)
         
-        events = events_result.get('items', [])
+        events = _merge_calendars(
+            caches,
+            datetime.datetime.fromisoformat(now.replace('Z', '+00:00')),
+            datetime.datetime.fromisoformat(time_max.replace('Z', '+00:00'))
+        )
         print(f"🔍 Found {len(events)} total events in time window")
 
         meetings = []
         for event in events:
-            # Only include events with Google Meet links
-            if 'hangoutLink' in event:
+            # Only include events with a video link (hangoutLink or conferenceData)
+            meet_url = meeting_link(event)
+            if meet_url:
                 start = event['start'].get('dateTime', event['start'].get('date'))
                 meeting_title = event.get('summary', 'No Title')
-                meet_url = event['hangoutLink']
                 
                 print(f"📅 Meeting: {meeting_title}")
                 print(f"⏰ Start time: {start}")
@@ -196,13 +294,8 @@ def get_upcoming_meetings():
                 if IS_GITHUB_ACTIONS:
                     # Calculate time until meeting for logging
                     try:
-                        if 'T' in start:
-                            start_dt = datetime.datetime.fromisoformat(start.replace('Z', '+00:00'))
-                        else:
-                            start_dt = datetime.datetime.fromisoformat(start)
-                        
-                        current_time = datetime.datetime.now(start_dt.tzinfo) if start_dt.tzinfo else datetime.datetime.now()
-                        time_diff = (start_dt - current_time).total_seconds() / 60
+                        current_time = datetime.datetime.now(datetime.timezone.utc)
+                        time_diff = (event_start(event) - current_time).total_seconds() / 60
                         print(f"⏳ Time until meeting: {time_diff:.1f} minutes")
                     except Exception as e:
                         print(f"⚠️ Could not calculate time difference: {e}")
@@ -223,6 +316,12 @@ def get_upcoming_meetings():
         traceback.print_exc()
         return []
 
+def get_schedule():
+    """
+    Sync the calendars and index their meetings for join-window lookups
+    """
+    return ScheduleIndex(get_upcoming_meetings())
+
 def test_calendar_access():
     """
     Test function to verify calendar access is working
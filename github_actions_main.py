@@ -1,6 +1,6 @@
 import os
-import time
 import datetime
+import importlib
 import sys
 import traceback
 
@@ -30,9 +30,14 @@ def main():
         print("✅ calendar_reader imported successfully")
         
         print("📦 Importing meet_joiner...")
-        from meet_joiner import join_meet  
+        # Sessions import it in their own worker processes; importing it here
+        # makes a broken install fail before any meeting is dispatched
+        importlib.import_module('meet_joiner')
         print("✅ meet_joiner imported successfully")
         
+        from session_pool import MeetingDispatcher
+        from schedule_index import JOIN_EARLY_SECONDS, JOIN_LATE_SECONDS, ScheduleIndex
+        
     except ImportError as e:
         print(f"❌ Import error: {e}")
         print("📦 Available Python modules:")
@@ -89,92 +94,63 @@ def main():
     print(f"\n📋 Processing {len(meetings)} meetings...")
     
     try:
-        now = datetime.datetime.now()
+        now = datetime.datetime.now(datetime.timezone.utc)
         print(f"🕐 Current time for comparison: {now}")
         
-        for i, meeting in enumerate(meetings, 1):
-            print(f"\n--- Processing Meeting {i}/{len(meetings)} ---")
-            
-            start_time_str = meeting['start'].get('dateTime', meeting['start'].get('date'))
-            print(f"📅 Raw start time: {start_time_str}")
-            
-            # Parse start time with error handling
-            try:
-                if 'T' in start_time_str:
-                    start_time = datetime.datetime.fromisoformat(start_time_str.replace('Z', '+00:00'))
-                else:
-                    start_time = datetime.datetime.fromisoformat(start_time_str)
-                print(f"✅ Parsed start time: {start_time}")
-            except Exception as parse_error:
-                print(f"❌ Error parsing start time '{start_time_str}': {parse_error}")
-                continue
-            
-            # Get current time in same timezone
-            if start_time.tzinfo:
-                current_time = datetime.datetime.now(start_time.tzinfo)
-                print(f"🌍 Using timezone-aware comparison: {current_time}")
-            else:
-                current_time = datetime.datetime.now()
-                print(f"🌍 Using local time comparison: {current_time}")
+        # Start times are parsed once here; the join window is a bisect lookup
+        schedule = ScheduleIndex(meetings)
+        due = schedule.join_window(now)
+        print(f"📐 Join window: -{JOIN_LATE_SECONDS // 60} to +{JOIN_EARLY_SECONDS // 60} minutes")
+        print(f"🎯 {len(due)} of {len(schedule)} meetings are in the join window")
+        
+        if not due:
+            next_meeting = schedule.next_start(now)
+            if next_meeting:
+                print(f"⏳ Next meeting '{next_meeting.title}' starts at {next_meeting.start} "
+                      f"({(next_meeting.start - now).total_seconds()/60:.1f} minutes)")
+                print("⏭️ Skipping - will join on next run if within window")
+        
+        # Every due meeting gets its own worker process with a browser and recorder
+        dispatcher = MeetingDispatcher()
+        
+        for i, meeting in enumerate(due, 1):
+            print(f"\n--- Processing Meeting {i}/{len(due)} ---")
             
-            time_until_meeting = (start_time - current_time).total_seconds()
-            meeting_title = meeting.get('summary', 'No Title')
-            meet_url = meeting.get('hangoutLink', 'No URL')
+            time_until_meeting = (meeting.start - now).total_seconds()
+            meeting_title = meeting.title
+            meet_url = meeting.url
             
             print(f"📋 Meeting: '{meeting_title}'")
-            print(f"⏰ Scheduled: {start_time}")
+            print(f"⏰ Scheduled: {meeting.start}")
             print(f"⏳ Time until meeting: {time_until_meeting/60:.1f} minutes")
             print(f"🔗 Meet URL: {meet_url}")
             
-            # Enhanced join logic with more detailed logging
-            if -600 <= time_until_meeting <= 180:  # -10 minutes to +3 minutes
-                print(f"🎯 MEETING IS IN JOIN WINDOW!")
-                print(f"📐 Time window: -10 to +3 minutes (actual: {time_until_meeting/60:.1f} minutes)")
-                
-                # Create clean title for recording
-                clean_title = "".join(c for c in meeting_title if c.isalnum() or c in (' ', '-', '_')).rstrip()
-                clean_title = clean_title.replace(' ', '_')[:50]  # Limit length and replace spaces
-                print(f"📝 Clean title for recording: '{clean_title}'")
-                
-                print(f"🎯 JOINING MEETING: {meeting_title}")
-                print(f"🔗 URL: {meet_url}")
-                
-                try:
-                    print("🚀 About to call join_meet function...")
-                    
-                    # Add timeout protection for meeting join
-                    if os.environ.get('GITHUB_ACTIONS') == 'true':
-                        signal.signal(signal.SIGALRM, timeout_handler)
-                        signal.alarm(2700)  # 45 minute timeout (safe margin for 50min GitHub limit)
-                    
-                    # This will record until meeting ends (with 50-minute GitHub Actions timeout)
-                    join_meet(meet_url, clean_title)
-                    
-                    # Cancel timeout
-                    if os.environ.get('GITHUB_ACTIONS') == 'true':
-                        signal.alarm(0)
-                    
-                    print(f"✅ Completed recording for: {meeting_title}")
-                    print("🔄 Breaking loop - only join one meeting per run")
-                    break  # Only join one meeting per run
-                    
-                except TimeoutError as timeout_error:
-                    print(f"⏰ Meeting join timed out: {timeout_error}")
-                    print("🔄 Continuing to check other meetings...")
-                    continue
-                except Exception as join_error:
-                    print(f"❌ Error joining meeting '{meeting_title}': {join_error}")
-                    print("📊 Full error traceback:")
-                    traceback.print_exc()
-                    print("🔄 Continuing to check other meetings...")
-                    continue
+            # Create clean title for recording
+            clean_title = "".join(c for c in meeting_title if c.isalnum() or c in (' ', '-', '_')).rstrip()
+            clean_title = clean_title.replace(' ', '_')[:50]  # Limit length and replace spaces
+            print(f"📝 Clean title for recording: '{clean_title}'")
             
-            elif time_until_meeting > 180:
-                print(f"⏳ Meeting too far in future ({time_until_meeting/60:.1f} minutes)")
-                print("⏭️ Skipping - will join on next run if within window")
+            print(f"🎯 JOINING MEETING: {meeting_title}")
+            print(f"🔗 URL: {meet_url}")
+            
+            try:
+                dispatcher.submit(meet_url, clean_title)
+            except Exception as join_error:
+                print(f"❌ Error joining meeting '{meeting_title}': {join_error}")
+                print("📊 Full error traceback:")
+                traceback.print_exc()
+                print("🔄 Continuing to check other meetings...")
+                continue
+        
+        # Sessions record until their meetings end and upload before exiting;
+        # 45 minutes is a safe margin for the 50 minute GitHub Actions limit
+        if due:
+            print(f"⏳ Waiting for {dispatcher.active_count()} sessions...")
+            if dispatcher.wait(timeout=2700):
+                dispatcher.shutdown()
             else:
-                print(f"⏭️ Meeting too far in past ({abs(time_until_meeting)/60:.1f} minutes ago)")
-                print("⏭️ Skipping - meeting already happened")
+                print("⏰ Sessions still running at the time limit - stopping them")
+                dispatcher.terminate()
         
         print(f"\n✅ Processed all {len(meetings)} meetings successfully")
         print("🔄 GitHub Actions run completed")
@@ -0,0 +1,106 @@
+import os
+import time
+from contextlib import contextmanager
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+# Time allowed from starting a join to being in the call
+JOIN_BUDGET_SECONDS = float(os.environ.get('JOIN_BUDGET_SECONDS', '90'))
+
+
+def _locator(selector):
+    return (By.XPATH, selector) if selector.startswith("//") else (By.CSS_SELECTOR, selector)
+
+
+def clickable_any(selectors):
+    """Condition: the first visible, enabled element matching any of the selectors"""
+    def condition(driver):
+        for selector in selectors:
+            try:
+                for element in driver.find_elements(*_locator(selector)):
+                    if element.is_displayed() and element.is_enabled():
+                        return element
+            except WebDriverException:
+                continue
+        return False
+    return condition
+
+
+def present_any(selectors):
+    """Condition: any element matching any of the selectors is in the DOM"""
+    def condition(driver):
+        for selector in selectors:
+            try:
+                if driver.find_elements(*_locator(selector)):
+                    return selector
+            except WebDriverException:
+                continue
+        return False
+    return condition
+
+
+def url_changed(from_url):
+    def condition(driver):
+        return driver.current_url != from_url
+    return condition
+
+
+class network_idle:
+    """Condition: the page has loaded and fetched no new resources for `quiet_seconds`"""
+    def __init__(self, quiet_seconds=0.5):
+        self.quiet_seconds = quiet_seconds
+        self.count = None
+        self.since = None
+
+    def __call__(self, driver):
+        state, count = driver.execute_script(
+            "return [document.readyState, performance.getEntriesByType('resource').length]"
+        )
+        now = time.monotonic()
+        if state != "complete" or count != self.count:
+            self.count = count
+            self.since = now
+            return False
+        return now - self.since >= self.quiet_seconds
+
+
+class JoinTimer:
+    """Overall time budget for a join, with per-step timings.
+
+    Every wait is capped by what is left of the budget, so a slow page
+    cannot stall a join indefinitely, and each step's duration is recorded
+    so the log shows which step was slow.
+    """
+    def __init__(self, driver, budget_seconds=JOIN_BUDGET_SECONDS, poll_frequency=0.2):
+        self.driver = driver
+        self.budget_seconds = budget_seconds
+        self.poll_frequency = poll_frequency
+        self.started = time.monotonic()
+        self.steps = []  # (name, seconds)
+
+    def remaining(self):
+        return max(0.0, self.budget_seconds - (time.monotonic() - self.started))
+
+    def until(self, condition, timeout=None, message=""):
+        """WebDriverWait.until, with the timeout capped by the remaining budget"""
+        limit = self.remaining() if timeout is None else min(timeout, self.remaining())
+        return WebDriverWait(self.driver, max(limit, 0.1), poll_frequency=self.poll_frequency).until(condition, message)
+
+    @contextmanager
+    def step(self, name):
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - started
+            self.steps.append((name, elapsed))
+            print(f"⏱️ {name}: {elapsed:.2f}s")
+
+    def report(self):
+        total = time.monotonic() - self.started
+        slowest = max(self.steps, key=lambda step: step[1]) if self.steps else None
+        print(f"⏱️ Join took {total:.1f}s of a {self.budget_seconds:.0f}s budget"
+              + (f" (slowest step: {slowest[0]}, {slowest[1]:.1f}s)" if slowest else ""))
+        return {'total_seconds': round(total, 2), 'steps': {name: round(seconds, 2) for name, seconds in self.steps}}
@@ -0,0 +1,142 @@
+import os
+import threading
+
+
+class LiveMultipartUpload:
+    """Upload a recording to B2 as S3 multipart parts while it is still being written.
+
+    The uploader follows the file the streaming writer appends to and pushes
+    each full part as soon as it is on disk. Part 1 holds the file header,
+    which is only final once the writer closes, so it is uploaded last.
+    """
+    def __init__(self, s3_client, bucket_name, key, filename, content_type='audio/wav',
+                 metadata=None, part_size_mb=8, poll_interval=2.0, max_part_attempts=3):
+        self.s3_client = s3_client
+        self.bucket_name = bucket_name
+        self.key = key
+        self.filename = filename
+        self.content_type = content_type
+        self.metadata = metadata or {}
+        self.part_size = int(part_size_mb * 1024 * 1024)
+        self.poll_interval = poll_interval
+        self.max_part_attempts = max_part_attempts
+
+        self.upload_id = None
+        self.parts = {}  # part number -> ETag
+        self.next_part_number = 2
+        self.failed = False
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        """Create the multipart upload and start following the file"""
+        response = self.s3_client.create_multipart_upload(
+            Bucket=self.bucket_name,
+            Key=self.key,
+            ContentType=self.content_type,
+            Metadata=self.metadata
+        )
+        self.upload_id = response['UploadId']
+        print(f"📤 Live upload started: {self.key} ({self.part_size // (1024 * 1024)} MB parts)")
+
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def complete(self):
+        """Upload the tail and the header part, then complete the upload.
+
+        Must be called after the writer has closed the file. Returns True if
+        the object is complete in the bucket, False if the upload was aborted.
+        """
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join()
+
+        if self.failed:
+            self.abort()
+            return False
+
+        try:
+            file_size = os.path.getsize(self.filename)
+            self._upload_full_parts(file_size)
+
+            # Whatever is left after the last full part
+            tail_offset = (self.next_part_number - 1) * self.part_size
+            if tail_offset < file_size:
+                self._upload_part(self.next_part_number, tail_offset, file_size - tail_offset)
+
+            # Header part goes last, now that the writer has patched it
+            self._upload_part(1, 0, min(self.part_size, file_size))
+
+            self.s3_client.complete_multipart_upload(
+                Bucket=self.bucket_name,
+                Key=self.key,
+                UploadId=self.upload_id,
+                MultipartUpload={
+                    'Parts': [
+                        {'PartNumber': number, 'ETag': etag}
+                        for number, etag in sorted(self.parts.items())
+                    ]
+                }
+            )
+            print(f"✅ Live upload completed: {self.key} ({len(self.parts)} parts)")
+            self.upload_id = None
+            return True
+
+        except Exception as e:
+            print(f"❌ Live upload could not be completed: {e}")
+            self.abort()
+            return False
+
+    def abort(self):
+        """Abort the multipart upload so B2 does not keep orphaned parts"""
+        self.stop_event.set()
+        if not self.upload_id:
+            return
+        try:
+            self.s3_client.abort_multipart_upload(
+                Bucket=self.bucket_name,
+                Key=self.key,
+                UploadId=self.upload_id
+            )
+            print(f"🗑️ Live upload aborted: {self.key}")
+        except Exception as e:
+            print(f"⚠️ Could not abort live upload: {e}")
+        self.upload_id = None
+
+    def _run(self):
+        while not self.stop_event.wait(self.poll_interval):
+            try:
+                self._upload_full_parts(os.path.getsize(self.filename))
+            except Exception as e:
+                print(f"❌ Live upload failed during recording: {e}")
+                self.failed = True
+                return
+
+    def _upload_full_parts(self, file_size):
+        """Upload every complete part (after the header part) already on disk"""
+        while self.next_part_number * self.part_size <= file_size:
+            offset = (self.next_part_number - 1) * self.part_size
+            self._upload_part(self.next_part_number, offset, self.part_size)
+            self.next_part_number += 1
+
+    def _upload_part(self, part_number, offset, length):
+        with open(self.filename, 'rb') as f:
+            f.seek(offset)
+            data = f.read(length)
+
+        for attempt in range(1, self.max_part_attempts + 1):
+            try:
+                response = self.s3_client.upload_part(
+                    Bucket=self.bucket_name,
+                    Key=self.key,
+                    UploadId=self.upload_id,
+                    PartNumber=part_number,
+                    Body=data
+                )
+                self.parts[part_number] = response['ETag']
+                return
+            except Exception as e:
+                if attempt == self.max_part_attempts:
+                    raise
+                print(f"⚠️ Part {part_number} upload failed (attempt {attempt}): {e}")
@@ -1,8 +1,11 @@
 import os
-import time
 import datetime
 from calendar_reader import get_upcoming_meetings
-from meet_joiner import join_meet
+from schedule_index import ScheduleIndex
+from session_pool import MeetingDispatcher
+
+# Longest the sessions of one run may take, uploads included, before they are killed
+SESSION_TIMEOUT_SECONDS = int(os.environ.get('SESSION_TIMEOUT_SECONDS', str(4 * 60 * 60)))
 
 def main():
     """
@@ -20,52 +23,46 @@ def main():
             print("No upcoming Google Meet meetings found.")
             return
         
-        now = datetime.datetime.now()
+        now = datetime.datetime.now(datetime.timezone.utc)
+        schedule = ScheduleIndex(meetings)
+        due = schedule.join_window(now)
         
-        for meeting in meetings:
-            start_time_str = meeting['start'].get('dateTime', meeting['start'].get('date'))
-            
-            # Parse start time
-            if 'T' in start_time_str:
-                start_time = datetime.datetime.fromisoformat(start_time_str.replace('Z', '+00:00'))
-            else:
-                start_time = datetime.datetime.fromisoformat(start_time_str)
-            
-            # Get current time in same timezone
-            if start_time.tzinfo:
-                current_time = datetime.datetime.now(start_time.tzinfo)
-            else:
-                current_time = datetime.datetime.now()
-            
-            time_until_meeting = (start_time - current_time).total_seconds()
-            meeting_title = meeting.get('summary', 'No Title')
-            meet_url = meeting.get('hangoutLink')
+        if not due:
+            next_meeting = schedule.next_start(now)
+            if next_meeting:
+                print(f"⏳ Next meeting '{next_meeting.title}' in {(next_meeting.start - now).total_seconds()/60:.1f} minutes")
+            print("🔄 GitHub Actions run completed")
+            return
+        
+        # Every meeting starting within the next 3 minutes or less than 10 minutes ago
+        # gets its own browser and recorder, so overlapping meetings are all recorded
+        dispatcher = MeetingDispatcher()
+        for meeting in due:
+            time_until_meeting = (meeting.start - now).total_seconds()
+            meeting_title = meeting.title
+            meet_url = meeting.url
             
             print(f"📋 Meeting: '{meeting_title}'")
-            print(f"⏰ Scheduled: {start_time}")
+            print(f"⏰ Scheduled: {meeting.start}")
             print(f"⏳ Time until meeting: {time_until_meeting/60:.1f} minutes")
             
-            # Join if meeting should start within next 3 minutes or started less than 10 minutes ago
-            if -600 <= time_until_meeting <= 180:  # -10 minutes to +3 minutes
-                clean_title = "".join(c for c in meeting_title if c.isalnum() or c in (' ', '-', '_')).rstrip()
-                
-                print(f"🎯 JOINING MEETING: {meeting_title}")
-                print(f"🔗 URL: {meet_url}")
-                
-                try:
-                    # This will record until meeting ends (with 50-minute GitHub Actions timeout)
-                    join_meet(meet_url, clean_title)
-                    print(f"✅ Completed recording for: {meeting_title}")
-                    break  # Only join one meeting per run
-                    
-                except Exception as e:
-                    print(f"❌ Error joining meeting '{meeting_title}': {e}")
-                    continue
+            clean_title = "".join(c for c in meeting_title if c.isalnum() or c in (' ', '-', '_')).rstrip()
             
-            elif time_until_meeting > 180:
-                print(f"⏳ Meeting too far in future ({time_until_meeting/60:.1f} minutes)")
-            else:
-                print(f"⏭️  Meeting too far in past ({abs(time_until_meeting)/60:.1f} minutes ago)")
+            print(f"🎯 JOINING MEETING: {meeting_title}")
+            print(f"🔗 URL: {meet_url}")
+            
+            try:
+                dispatcher.submit(meet_url, clean_title)
+            except Exception as e:
+                print(f"❌ Error joining meeting '{meeting_title}': {e}")
+                continue
+        
+        # Each session records until its meeting ends and waits for its own uploads
+        if dispatcher.wait(timeout=SESSION_TIMEOUT_SECONDS):
+            dispatcher.shutdown()
+        else:
+            print("⏰ Sessions still running at the time limit - stopping them")
+            dispatcher.terminate()
         
         print("🔄 GitHub Actions run completed")
         
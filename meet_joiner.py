@@ -1,15 +1,15 @@
 import os
 import time
 import random
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.keys import Keys
 from dotenv import load_dotenv
 from audio_recorder import AudioRecorder
-import chromedriver_autoinstaller
+from join_timing import JoinTimer, clickable_any, network_idle, present_any, url_changed
+from browser_pool import get_browser_pool
+from meeting_monitor import MONITOR_POLL_SECONDS, MeetingWatcher, meeting_status
+from tab_audio import TAB_AUDIO_CAPTURE, TabAudioCapture
 
 load_dotenv()
 
@@ -21,6 +21,159 @@ IS_LOCAL = not (IS_GITHUB_ACTIONS or IS_RENDER)
 BOT_EMAIL = os.environ["BOT_EMAIL"]
 BOT_PASSWORD = os.environ["BOT_PASSWORD"]
 
+# Pre-join screen buttons, in order of preference
+JOIN_SELECTORS = [
+    "//span[contains(text(), 'Join now')]/parent::button",
+    "//span[contains(text(), 'Ask to join')]/parent::button",
+    "[aria-label*='Join']",
+    "button[jsname='Qx7uuf']"
+]
+
+# Present once the bot is in the call (or waiting to be let in)
+IN_CALL_SELECTORS = [
+    "[aria-label*='Leave call']",
+    "//div[contains(text(), 'Asking to be let in')]",
+    "//div[contains(text(), 'Please wait until a meeting host')]"
+]
+
+# Room silence that ends the recording while the page shows no one else in
+# the call (or no participant count at all)
+MEETING_SILENCE_END_SECONDS = float(os.environ.get('MEETING_SILENCE_END_SECONDS', '600'))
+# Silence that confirms the page's "only the bot is left" signal
+ALONE_SILENCE_SECONDS = 5
+# How long the page's "alone" signal alone ends the meeting while audio keeps coming in
+ALONE_MAX_SECONDS = 120
+
+PASSWORD_SELECTORS = [
+    "input[name='password']",
+    "//input[@type='password']",
+    "//div[@id='password']//input",
+    "//*[@id='password']/div[1]/div/div[1]/input"
+]
+
+def open_meeting(driver, timer, meet_url):
+    """Load the Meet URL and wait until the pre-join screen (or the call) is there"""
+    if "meet.google.com" not in driver.current_url:
+        print(f"Navigating to Meet URL: {meet_url}")
+        driver.get(meet_url)
+    try:
+        with timer.step("meet page"):
+            timer.until(present_any(JOIN_SELECTORS + IN_CALL_SELECTORS))
+    except Exception:
+        print("⚠️ Meet pre-join screen did not appear within the join budget - trying to join anyway")
+
+def google_login(driver, timer, meet_url):
+    """Sign the bot into Google, typing its credentials, and land on the Meet URL"""
+    print("Starting Google login process...")
+    
+    # Login URL
+    login_url = f"https://accounts.google.com/signin/v2/identifier?continue={meet_url}&flowName=GlifWebSignIn&flowEntry=ServiceLogin"
+    driver.get(login_url)
+    
+    # Enter email with human-like typing
+    print("Entering email...")
+    with timer.step("login page"):
+        email_input = timer.until(EC.element_to_be_clickable((By.ID, "identifierId")))
+    email_input.clear()
+    
+    # Faster typing in GitHub Actions
+    typing_delay = (0.02, 0.08) if IS_GITHUB_ACTIONS else (0.05, 0.15)
+    for char in BOT_EMAIL:
+        email_input.send_keys(char)
+        time.sleep(random.uniform(*typing_delay))
+    
+    # Click Next, then wait for whatever comes after the identifier page.
+    # The identifier page already holds a hidden password input, so only a
+    # visible one shows that Google moved on
+    identifier_url = driver.current_url
+    next_button = timer.until(EC.element_to_be_clickable((By.ID, "identifierNext")))
+    next_button.click()
+    with timer.step("email submitted"):
+        timer.until(EC.any_of(url_changed(identifier_url), clickable_any(PASSWORD_SELECTORS)))
+    
+    # Handle recovery setup screen
+    print("Checking for recovery setup screen...")
+    try:
+        if "recovery" in driver.current_url.lower() or "backup" in driver.current_url.lower():
+            print("Recovery setup screen detected. Trying to skip...")
+            
+            skip_buttons = [
+                "//span[contains(text(), 'Skip')]/parent::button",
+                "//span[contains(text(), 'Not now')]/parent::button", 
+                "//span[contains(text(), 'Maybe later')]/parent::button",
+                "//button[contains(@aria-label, 'Skip')]",
+                "[data-value='skip']"
+            ]
+            
+            skipped = False
+            for selector in skip_buttons:
+                try:
+                    if selector.startswith("//"):
+                        skip_button = driver.find_element(By.XPATH, selector)
+                    else:
+                        skip_button = driver.find_element(By.CSS_SELECTOR, selector)
+                    skip_button.click()
+                    print(f"Clicked skip button: {selector}")
+                    skipped = True
+                    break
+                except:
+                    continue
+            
+            if not skipped and not IS_GITHUB_ACTIONS:
+                print("Could not find skip button. Manual intervention may be needed.")
+                input("Please manually skip the recovery setup and press Enter to continue...")
+            elif not skipped and IS_GITHUB_ACTIONS:
+                print("⚠️ Could not skip recovery screen in GitHub Actions - may cause issues")
+    except Exception as e:
+        print(f"Recovery screen handling: {e}")
+    
+    # Password entry
+    print("Waiting for password field...")
+    password_input = None
+    
+    try:
+        with timer.step("password field"):
+            password_input = timer.until(clickable_any(PASSWORD_SELECTORS))
+    except Exception:
+        pass
+    
+    if not password_input:
+        raise Exception("Could not find password input field with any selector")
+    
+    print("Entering password...")
+    password_input.clear()
+    
+    # Faster password typing in GitHub Actions
+    for char in BOT_PASSWORD:
+        password_input.send_keys(char)
+        time.sleep(random.uniform(*typing_delay))
+    
+    # Click Next for password
+    password_next = timer.until(EC.element_to_be_clickable((By.ID, "passwordNext")))
+    password_next.click()
+    
+    # Check login status
+    print("Checking login status...")
+    
+    try:
+        with timer.step("signed in"):
+            timer.until(lambda driver: 
+                "meet.google.com" in driver.current_url or 
+                "myaccount.google.com" in driver.current_url or
+                "accounts.google.com" not in driver.current_url
+            )
+    except:
+        if IS_GITHUB_ACTIONS:
+            print("⚠️ Login verification required - this may fail in GitHub Actions")
+            # Try to continue anyway
+        else:
+            print("Login may require additional verification. Check the browser window.")
+            input("If you see a verification screen, complete it and press Enter to continue...")
+            # The budget must not count the time a human spent on the verification screen
+            timer.started = time.monotonic()
+    
+    open_meeting(driver, timer, meet_url)
+
 def join_meet(meet_url, meeting_name="meeting"):
     if IS_GITHUB_ACTIONS:
         print("🔧 Running in GitHub Actions environment")
@@ -29,214 +182,83 @@ def join_meet(meet_url, meeting_name="meeting"):
     else:
         print("🔧 Running in local environment")
     
-    chromedriver_autoinstaller.install()
-    chrome_options = Options()
-    
-    # Base Chrome options for headless operation
-    chrome_options.add_argument("--headless=new")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    chrome_options.add_argument("--disable-gpu")
-    
-    # GitHub Actions specific optimizations
-    if IS_GITHUB_ACTIONS:
-        chrome_options.add_argument("--disable-web-security")
-        chrome_options.add_argument("--disable-features=VizDisplayCompositor")
-        chrome_options.add_argument("--single-process")
-        chrome_options.add_argument("--disable-background-timer-throttling")
-        chrome_options.add_argument("--disable-renderer-backgrounding")
-        chrome_options.add_argument("--disable-backgrounding-occluded-windows")
-        chrome_options.add_argument("--disable-extensions")
-        chrome_options.add_argument("--memory-pressure-off")
-        chrome_options.add_argument("--max_old_space_size=4096")
-    else:
-        chrome_options.add_argument("--remote-debugging-port=9222")
-    
-    # Media and automation options
-    chrome_options.add_argument("--use-fake-ui-for-media-stream")
-    chrome_options.add_argument("--disable-notifications")
-    chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    chrome_options.add_experimental_option('useAutomationExtension', False)
-    chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
-    
-    driver = webdriver.Chrome(options=chrome_options)
-    driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-    
-    # Adjust timeouts based on environment
-    timeout_duration = 20 if IS_GITHUB_ACTIONS else 30
-    wait = WebDriverWait(driver, timeout_duration)
-    
-    recorder = AudioRecorder(upload_to_b2=True)
+    browser = None
+    driver = None
+    tab_capture = None
+    recorder = None
+    session_failed = False
     
     try:
-        print("Starting Google login process...")
-        
-        # Login URL
-        login_url = f"https://accounts.google.com/signin/v2/identifier?continue={meet_url}&flowName=GlifWebSignIn&flowEntry=ServiceLogin"
-        driver.get(login_url)
-        time.sleep(2 if IS_GITHUB_ACTIONS else 3)
-        
-        # Enter email with human-like typing
-        print("Entering email...")
-        email_input = wait.until(EC.element_to_be_clickable((By.ID, "identifierId")))
-        email_input.clear()
+        # A warm browser from the pool; each has its own audio sink, so parallel
+        # sessions stay apart
+        browser = get_browser_pool().acquire()
+        driver = browser.driver
+        sink = browser.sink
+        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
         
-        # Faster typing in GitHub Actions
-        typing_delay = (0.02, 0.08) if IS_GITHUB_ACTIONS else (0.05, 0.15)
-        for char in BOT_EMAIL:
-            email_input.send_keys(char)
-            time.sleep(random.uniform(*typing_delay))
+        # Every wait in the join is capped by one overall budget
+        timer = JoinTimer(driver)
         
-        time.sleep(0.5 if IS_GITHUB_ACTIONS else 1)
-        
-        # Click Next
-        next_button = wait.until(EC.element_to_be_clickable((By.ID, "identifierNext")))
-        next_button.click()
-        time.sleep(3 if IS_GITHUB_ACTIONS else 4)
-        
-        # Handle recovery setup screen
-        print("Checking for recovery setup screen...")
-        try:
-            if "recovery" in driver.current_url.lower() or "backup" in driver.current_url.lower():
-                print("Recovery setup screen detected. Trying to skip...")
-                
-                skip_buttons = [
-                    "//span[contains(text(), 'Skip')]/parent::button",
-                    "//span[contains(text(), 'Not now')]/parent::button", 
-                    "//span[contains(text(), 'Maybe later')]/parent::button",
-                    "//button[contains(@aria-label, 'Skip')]",
-                    "[data-value='skip']"
-                ]
-                
-                skipped = False
-                for selector in skip_buttons:
-                    try:
-                        if selector.startswith("//"):
-                            skip_button = driver.find_element(By.XPATH, selector)
-                        else:
-                            skip_button = driver.find_element(By.CSS_SELECTOR, selector)
-                        skip_button.click()
-                        print(f"Clicked skip button: {selector}")
-                        skipped = True
-                        break
-                    except:
-                        continue
-                
-                if not skipped and not IS_GITHUB_ACTIONS:
-                    print("Could not find skip button. Manual intervention may be needed.")
-                    input("Please manually skip the recovery setup and press Enter to continue...")
-                elif not skipped and IS_GITHUB_ACTIONS:
-                    print("⚠️ Could not skip recovery screen in GitHub Actions - may cause issues")
-                
-                time.sleep(2 if IS_GITHUB_ACTIONS else 3)
-        except Exception as e:
-            print(f"Recovery screen handling: {e}")
-        
-        # Password entry
-        print("Waiting for password field...")
-        password_input = None
-        
-        password_selectors = [
-            (By.NAME, "password"),
-            (By.XPATH, "//input[@type='password']"),
-            (By.XPATH, "//input[@name='password']"),
-            (By.CSS_SELECTOR, "input[type='password']"),
-            (By.XPATH, "//div[@id='password']//input"),
-            (By.XPATH, "//*[@id='password']/div[1]/div/div[1]/input")
-        ]
-        
-        for selector_type, selector_value in password_selectors:
+        # Tab capture hooks the page's WebRTC audio, so it must be in place before Meet loads
+        if TAB_AUDIO_CAPTURE:
             try:
-                password_input = wait.until(EC.element_to_be_clickable((selector_type, selector_value)))
-                print(f"Found password field with selector: {selector_type}, {selector_value}")
-                break
-            except:
-                continue
+                tab_capture = TabAudioCapture(driver)
+                tab_capture.install()
+            except Exception as e:
+                print(f"⚠️ Could not install tab audio capture, recording from the audio device: {e}")
+                tab_capture = None
         
-        if not password_input:
-            raise Exception("Could not find password input field with any selector")
+        recorder = AudioRecorder(upload_to_b2=True, source=sink.monitor if sink else None, tab_capture=tab_capture)
         
-        print("Entering password...")
-        password_input.clear()
-        time.sleep(0.5 if IS_GITHUB_ACTIONS else 1)
-        
-        # Faster password typing in GitHub Actions
-        for char in BOT_PASSWORD:
-            password_input.send_keys(char)
-            time.sleep(random.uniform(*typing_delay))
-        
-        time.sleep(0.5 if IS_GITHUB_ACTIONS else 1)
-        
-        # Click Next for password
-        password_next = wait.until(EC.element_to_be_clickable((By.ID, "passwordNext")))
-        password_next.click()
-        time.sleep(4 if IS_GITHUB_ACTIONS else 5)
-        
-        # Check login status
-        print("Checking login status...")
-        
-        try:
-            wait.until(lambda driver: 
-                "meet.google.com" in driver.current_url or 
-                "myaccount.google.com" in driver.current_url or
-                "accounts.google.com" not in driver.current_url
-            )
-            
-            if "meet.google.com" not in driver.current_url:
-                print(f"Navigating to Meet URL: {meet_url}")
-                driver.get(meet_url)
-                time.sleep(4 if IS_GITHUB_ACTIONS else 5)
-        except:
-            if IS_GITHUB_ACTIONS:
-                print("⚠️ Login verification required - this may fail in GitHub Actions")
-                # Try to continue anyway
-                driver.get(meet_url)
-                time.sleep(4)
-            else:
-                print("Login may require additional verification. Check the browser window.")
-                input("If you see a verification screen, complete it and press Enter to continue...")
-                driver.get(meet_url)
-                time.sleep(5)
+        # Reuse the Google session saved in the browser profile / cookie jar and
+        # only go through the typed login when it is missing or has expired
+        if browser.has_google_session():
+            print("🔑 Saved Google session found - going straight to the meeting")
+            driver.get(meet_url)
+            try:
+                with timer.step("meet redirect"):
+                    timer.until(EC.any_of(
+                        present_any(JOIN_SELECTORS + IN_CALL_SELECTORS),
+                        EC.url_contains("accounts.google.com")
+                    ))
+            except Exception:
+                print("⚠️ Meet page is slow to load - trying to join anyway")
+            if "accounts.google.com" in driver.current_url:
+                print("⚠️ Saved session was rejected, signing in again")
+                google_login(driver, timer, meet_url)
+        else:
+            google_login(driver, timer, meet_url)
+        browser.save_google_session()
         
         # Join meeting
         print("Attempting to join the meeting...")
         
         try:
-            time.sleep(2 if IS_GITHUB_ACTIONS else 3)
-            
             print("Camera and microphone are disabled by default - joining as recording bot")
             
-            join_selectors = [
-                "//span[contains(text(), 'Join now')]/parent::button",
-                "//span[contains(text(), 'Ask to join')]/parent::button",
-                "[aria-label*='Join']",
-                "button[jsname='Qx7uuf']"
-            ]
-            
-            joined = False
-            for selector in join_selectors:
-                try:
-                    if selector.startswith("//"):
-                        join_button = driver.find_element(By.XPATH, selector)
-                    else:
-                        join_button = driver.find_element(By.CSS_SELECTOR, selector)
-                    join_button.click()
-                    print(f"Clicked join button with selector: {selector}")
-                    joined = True
-                    break
-                except:
-                    continue
+            try:
+                with timer.step("pre-join idle"):
+                    # Let the pre-join screen finish loading before clicking into the call
+                    timer.until(network_idle(), timeout=5)
+            except Exception:
+                pass  # Meet keeps some connections busy; don't wait past the short cap
             
-            if not joined:
+            try:
+                join_button = timer.until(clickable_any(JOIN_SELECTORS))
+                join_button.click()
+                print("Clicked join button")
+            except Exception:
                 print("Could not find join button, trying Enter key...")
                 driver.find_element(By.TAG_NAME, "body").send_keys(Keys.ENTER)
             
-            time.sleep(4 if IS_GITHUB_ACTIONS else 5)
+            with timer.step("in call"):
+                timer.until(present_any(IN_CALL_SELECTORS))
             
         except Exception as e:
             print(f"Error during meeting join: {e}")
         
+        timer.report()
+        
         print("Bot should now be in the Google Meet.")
         
         # START AUDIO RECORDING
@@ -252,11 +274,17 @@ def join_meet(meet_url, meeting_name="meeting"):
         
         print("🎧 Audio recording active... Monitoring for meeting end...")
         
-        # ENHANCED MEETING END DETECTION with GitHub Actions optimizations
-        consecutive_end_checks = 0
-        check_interval = 5 if IS_GITHUB_ACTIONS else 3  # Less frequent checks in GitHub Actions
+        # MEETING END DETECTION: the page pushes state changes, we block until one arrives
+        retry_interval = 5 if IS_GITHUB_ACTIONS else 3  # pause after a failed check
+        # More lenient threshold in GitHub Actions
+        alone_grace = (2 if IS_GITHUB_ACTIONS else 3) * retry_interval
         max_meeting_duration = 45 * 60 if IS_GITHUB_ACTIONS else 60 * 60  # 45 or 60 minutes
         start_time = time.time()
+        alone_since = None
+        participants = None
+        consecutive_errors = 0
+        watcher = MeetingWatcher(driver)
+        watcher_installed = False
         
         try:
             while True:
@@ -268,112 +296,102 @@ def join_meet(meet_url, meeting_name="meeting"):
                     recorder.stop_recording()
                     return
                 
-                time.sleep(check_interval)
+                # Wake up early only for the deadlines we enforce ourselves
+                # Tab capture reads through this driver too, and WebDriver runs one
+                # command per session at a time, so keep the long-poll short
+                timeout = MONITOR_POLL_SECONDS if tab_capture is None else 1.0
+                if IS_GITHUB_ACTIONS:
+                    timeout = min(timeout, max_meeting_duration - elapsed_time)
+                if alone_since is not None:
+                    # Re-check the audio often while the page says the bot is alone
+                    timeout = min(timeout, 1.0)
                 
-                current_url = driver.current_url
-                page_title = driver.title.lower()
                 meeting_ended = False
                 
-                # Method 1: URL change detection
-                if "meet.google.com" not in current_url:
-                    print(f"🔍 Detected URL change: {current_url}")
-                    meeting_ended = True
-                
-                # Method 2: Check for meeting end indicators
-                elif "meet.google.com" in current_url:
-                    try:
-                        # Look for specific meeting end messages
-                        end_indicators = [
-                            "//div[contains(text(), 'You left the meeting')]",
-                            "//div[contains(text(), 'left the meeting')]",
-                            "//div[contains(text(), 'Meeting ended')]",
-                            "//div[contains(text(), 'meeting has ended')]",
-                            "//div[contains(text(), 'This meeting has ended')]",
-                            "//span[contains(text(), 'meeting has ended')]",
-                            "//div[contains(text(), 'Thanks for joining')]",
-                            "//button[contains(text(), 'Return to home screen')]",
-                            "//button[contains(text(), 'Join or start a meeting')]",
-                            "//div[contains(text(), 'Rejoin')]",
-                            "//button[contains(@aria-label, 'Leave call')][@aria-pressed='true']"
-                        ]
+                try:
+                    if not watcher_installed:
+                        # Keep trying to put the observer in place; until then poll the page
+                        try:
+                            watcher.install()
+                            watcher_installed = True
+                        except Exception as e:
+                            print(f"⚠️ Could not install the meeting observer, polling the page instead: {e}")
+                    if watcher_installed:
+                        try:
+                            events = watcher.wait(max(timeout, 0.1))
+                        except Exception:
+                            # Leaving the call can unload the page mid-wait; look at where we are now
+                            events = [meeting_status(driver)]
+                    else:
+                        time.sleep(min(retry_interval, max(timeout, 0.1)))
+                        events = [meeting_status(driver)]
+                    consecutive_errors = 0
+                    
+                    for status in events:
+                        if status['participants'] is not None and status['participants'] != participants:
+                            participants = status['participants']
+                            print(f"👥 {participants} participant(s) in the meeting")
+                        
+                        # Method 1: URL change detection
+                        if "meet.google.com" not in status['url']:
+                            print(f"🔍 Detected URL change: {status['url']}")
+                            meeting_ended = True
                         
-                        for indicator in end_indicators:
-                            try:
-                                element = driver.find_element(By.XPATH, indicator)
-                                if element.is_displayed():
-                                    print(f"🔍 Detected meeting end indicator: '{element.text.strip()}'")
-                                    meeting_ended = True
-                                    break
-                            except:
-                                continue
+                        # Method 2: Check for meeting end indicators
+                        elif status['ended']:
+                            print(f"🔍 Detected meeting end indicator: '{status['ended']['text']}'")
+                            meeting_ended = True
                         
                         # Method 3: Check if we're back on main Meet page
-                        if not meeting_ended:
-                            main_page_indicators = [
-                                "//div[contains(text(), 'Start a meeting')]",
-                                "//button[contains(text(), 'New meeting')]",
-                                "//input[@placeholder='Enter a code or link']",
-                                "//div[@data-meeting-title]",
-                                "//div[contains(@aria-label, 'Start a meeting')]"
-                            ]
-                            
-                            for indicator in main_page_indicators:
-                                try:
-                                    element = driver.find_element(By.XPATH, indicator)
-                                    if element.is_displayed():
-                                        print("🔍 Detected: Back at Google Meet main page")
-                                        meeting_ended = True
-                                        break
-                                except:
-                                    continue
+                        elif status['main_page']:
+                            print("🔍 Detected: Back at Google Meet main page")
+                            meeting_ended = True
                         
                         # Method 4: Check for participant count = 1 (only bot left)
-                        if not meeting_ended:
-                            try:
-                                participant_indicators = [
-                                    "//div[contains(@aria-label, '1 participant')]",
-                                    "//span[text()='1']//parent::div[contains(@aria-label, 'participant')]"
-                                ]
-                                
-                                for indicator in participant_indicators:
-                                    try:
-                                        element = driver.find_element(By.XPATH, indicator)
-                                        if element.is_displayed():
-                                            consecutive_end_checks += 1
-                                            # More lenient threshold in GitHub Actions
-                                            threshold = 2 if IS_GITHUB_ACTIONS else 3
-                                            if consecutive_end_checks >= threshold:
-                                                duration = threshold * check_interval
-                                                print(f"🔍 Detected: Only bot remaining in meeting for {duration}+ seconds")
-                                                meeting_ended = True
-                                            break
-                                    except:
-                                        continue
-                                else:
-                                    consecutive_end_checks = 0
-                                    
-                            except:
-                                pass
-                                
-                    except Exception as e:
-                        print(f"Error checking page elements: {e}")
-                        consecutive_end_checks += 1
-                        # More aggressive timeout in GitHub Actions
-                        error_threshold = 6 if IS_GITHUB_ACTIONS else 10
-                        if consecutive_end_checks > error_threshold:
-                            duration = error_threshold * check_interval
-                            print(f"🔍 Unable to verify meeting status for {duration}+ seconds - assuming meeting ended")
-                            meeting_ended = True
+                        elif status['alone']:
+                            alone_since = alone_since or time.time()
+                        else:
+                            alone_since = None
+                        
+                        if meeting_ended:
+                            break
+                    
+                    # Fuse the page's view with what the recorder hears
+                    audio = recorder.activity_stats()
+                    alone_for = time.time() - alone_since if alone_since is not None else None
+                    if meeting_ended:
+                        pass
+                    elif alone_for is not None and audio and audio['silent_seconds'] >= ALONE_SILENCE_SECONDS:
+                        print(f"🔍 Detected: Only bot remaining and the room silent for {audio['silent_seconds']:.0f}s")
+                        meeting_ended = True
+                    elif alone_for is not None and alone_for >= (alone_grace if audio is None else ALONE_MAX_SECONDS):
+                        # Without audio stats the page is all we have; with them, voices
+                        # still coming in mean the participant count is probably wrong
+                        print(f"🔍 Detected: Only bot remaining in meeting for {alone_for:.0f}+ seconds")
+                        meeting_ended = True
+                    elif (audio and audio['heard_audio'] and audio['silent_seconds'] >= MEETING_SILENCE_END_SECONDS
+                          and (participants is None or participants <= 1)):
+                        # Silence alone is not enough while the page still counts other people
+                        print(f"🔇 Room silent for {audio['silent_seconds'] / 60:.1f} minutes - assuming the meeting is over")
+                        meeting_ended = True
+                        
+                except Exception as e:
+                    print(f"Error checking page elements: {e}")
+                    consecutive_errors += 1
+                    # More aggressive timeout in GitHub Actions
+                    error_threshold = 6 if IS_GITHUB_ACTIONS else 10
+                    if consecutive_errors > error_threshold:
+                        duration = error_threshold * retry_interval
+                        print(f"🔍 Unable to verify meeting status for {duration}+ seconds - assuming meeting ended")
+                        meeting_ended = True
+                    else:
+                        time.sleep(retry_interval)
                 
                 if meeting_ended:
                     print("🛑 Meeting ended detected! Stopping recording...")
                     recorder.stop_recording()
                     print("✅ Recording stopped and uploaded to B2")
                     return
-                else:
-                    # Reset consecutive checks if meeting is still active
-                    if consecutive_end_checks > 0 and consecutive_end_checks < (2 if IS_GITHUB_ACTIONS else 3):
-                        consecutive_end_checks = 0
                         
         except KeyboardInterrupt:
             print("\nManual stop requested...")
@@ -385,6 +403,7 @@ def join_meet(meet_url, meeting_name="meeting"):
             
     except Exception as e:
         print(f"Error occurred: {e}")
+        session_failed = True
         
         # Save screenshot for debugging (but not in GitHub Actions due to space limits)
         if not IS_GITHUB_ACTIONS:
@@ -394,17 +413,25 @@ def join_meet(meet_url, meeting_name="meeting"):
             except:
                 print("Could not save screenshot")
         
-        if recorder.is_recording:
+        if recorder and recorder.is_recording:
             print("Stopping recording due to error...")
             recorder.stop_recording()
         
-        print(f"Current URL: {driver.current_url}")
-        print("Page title:", driver.title)
+        if driver:
+            try:
+                print(f"Current URL: {driver.current_url}")
+                print("Page title:", driver.title)
+            except Exception:
+                print("Could not read the page state")
         raise
     finally:
-        if recorder.is_recording:
+        if recorder and recorder.is_recording:
             recorder.stop_recording()
-        driver.quit()
+        if tab_capture:
+            tab_capture.remove()
+        # A browser that hit an error is replaced rather than reused
+        if browser:
+            get_browser_pool().release(browser, healthy=not session_failed)
         print("🔄 Returning to calendar monitoring...")
 
 def test_meet_join():
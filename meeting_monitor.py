@@ -0,0 +1,162 @@
+# Messages and buttons shown once the bot has left, was removed or the meeting is over
+END_INDICATORS = [
+    "//div[contains(text(), 'You left the meeting')]",
+    "//div[contains(text(), 'left the meeting')]",
+    "//div[contains(text(), 'Meeting ended')]",
+    "//div[contains(text(), 'meeting has ended')]",
+    "//div[contains(text(), 'This meeting has ended')]",
+    "//span[contains(text(), 'meeting has ended')]",
+    "//div[contains(text(), 'Thanks for joining')]",
+    "//div[contains(text(), 'removed from the meeting')]",
+    "//button[contains(text(), 'Return to home screen')]",
+    "//button[contains(text(), 'Join or start a meeting')]",
+    "//div[contains(text(), 'Rejoin')]",
+    "//button[contains(@aria-label, 'Leave call')][@aria-pressed='true']"
+]
+
+# The Meet landing page, where the bot ends up after the call
+MAIN_PAGE_INDICATORS = [
+    "//div[contains(text(), 'Start a meeting')]",
+    "//button[contains(text(), 'New meeting')]",
+    "//input[@placeholder='Enter a code or link']",
+    "//div[@data-meeting-title]",
+    "//div[contains(@aria-label, 'Start a meeting')]"
+]
+
+# Participant counter showing only the bot, used when no "N participants"
+# label gives the count
+ALONE_INDICATORS = [
+    "//span[text()='1']//parent::div[contains(@aria-label, 'participant')]"
+]
+
+# How long one wait for a page event may block; the page answers sooner
+# as soon as the meeting state changes
+MONITOR_POLL_SECONDS = 30
+
+# In-page checks shared by the one-off snapshot and the observer
+STATUS_FUNCTIONS = """
+function visible(node) {
+    if (!node || !node.getClientRects().length) return false;
+    const style = getComputedStyle(node);
+    return style.visibility !== 'hidden' && style.display !== 'none';
+}
+function firstVisible(xpaths) {
+    for (const xpath of xpaths) {
+        const found = document.evaluate(xpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        for (let i = 0; i < found.snapshotLength; i++) {
+            const node = found.snapshotItem(i);
+            if (visible(node)) return {xpath: xpath, text: (node.innerText || '').trim().slice(0, 200)};
+        }
+    }
+    return null;
+}
+function participantCount() {
+    for (const node of document.querySelectorAll('[aria-label*="participant"]')) {
+        const match = /(\\d+)\\s+participants?/i.exec(node.getAttribute('aria-label'));
+        if (match) return parseInt(match[1], 10);
+    }
+    return null;
+}
+function snapshot(endXPaths, mainXPaths, aloneXPaths) {
+    const participants = participantCount();
+    return {
+        url: location.href,
+        title: document.title,
+        ended: firstVisible(endXPaths),
+        main_page: firstVisible(mainXPaths) !== null,
+        alone: participants !== null ? participants <= 1 : firstVisible(aloneXPaths) !== null,
+        participants: participants
+    };
+}
+"""
+
+# Runs every check inside the page and returns only the outcome, so a
+# monitoring tick is one WebDriver round-trip instead of one per selector
+STATUS_SCRIPT = STATUS_FUNCTIONS + """
+return snapshot(...arguments);
+"""
+
+# Installs a MutationObserver that re-evaluates the status whenever the DOM
+# changes (debounced) and queues every transition for the Python side
+OBSERVER_SCRIPT = STATUS_FUNCTIONS + """
+if (window.__meetBot) return false;
+const [endXPaths, mainXPaths, aloneXPaths] = arguments;
+const bot = window.__meetBot = {events: [], waiter: null, last: null, scheduled: false};
+function check() {
+    bot.scheduled = false;
+    const status = snapshot(endXPaths, mainXPaths, aloneXPaths);
+    const key = JSON.stringify([status.url, status.ended && status.ended.xpath, status.main_page, status.alone, status.participants]);
+    if (key === bot.last) return;
+    bot.last = key;
+    status.at = Date.now();
+    bot.events.push(status);
+    if (bot.events.length > 100) bot.events.shift();
+    if (bot.waiter) bot.waiter();
+}
+new MutationObserver(() => {
+    if (!bot.scheduled) {
+        bot.scheduled = true;
+        setTimeout(check, 300);
+    }
+}).observe(document.documentElement, {
+    childList: true, subtree: true, characterData: true,
+    attributes: true, attributeFilter: ['aria-label', 'aria-pressed']
+});
+check();
+return true;
+"""
+
+# Long-poll: hands back queued transitions at once, or holds the call open
+# until the observer queues one or the timeout passes. null means the page
+# was replaced and the observer has to be installed again.
+WAIT_SCRIPT = """
+const timeoutMs = arguments[0];
+const done = arguments[arguments.length - 1];
+const bot = window.__meetBot;
+if (!bot) return done(null);
+const drain = () => {
+    clearTimeout(timer);
+    bot.waiter = null;
+    done(bot.events.splice(0));
+};
+const timer = setTimeout(drain, timeoutMs);
+if (bot.events.length) drain(); else bot.waiter = drain;
+"""
+
+
+def meeting_status(driver):
+    """Snapshot of the meeting page in a single execute_script call.
+
+    Returns a dict with the page `url` and `title`, `ended` (the first
+    visible end indicator as {'xpath', 'text'}, or None), `main_page` (back
+    on the Meet landing page), `alone` (only the bot is left, taken from the
+    participant count when it is shown) and `participants` (the participant
+    count, or None if not shown).
+    """
+    return driver.execute_script(STATUS_SCRIPT, END_INDICATORS, MAIN_PAGE_INDICATORS, ALONE_INDICATORS)
+
+
+class MeetingWatcher:
+    """Meeting state pushed from the page instead of polled.
+
+    An injected MutationObserver records each change of the meeting status
+    (same fields as meeting_status) in the page; `wait` long-polls for
+    them, so an idle meeting costs one blocked WebDriver call per
+    MONITOR_POLL_SECONDS and an ending meeting is noticed within a few
+    hundred milliseconds.
+    """
+    def __init__(self, driver):
+        self.driver = driver
+
+    def install(self):
+        self.driver.execute_script(OBSERVER_SCRIPT, END_INDICATORS, MAIN_PAGE_INDICATORS, ALONE_INDICATORS)
+
+    def wait(self, timeout=MONITOR_POLL_SECONDS):
+        """Status changes since the last call, waiting up to `timeout` seconds for the first"""
+        self.driver.set_script_timeout(timeout + 10)
+        events = self.driver.execute_async_script(WAIT_SCRIPT, int(timeout * 1000))
+        if events is None:
+            # New document: observe it too, starting with its current status
+            self.install()
+            events = self.driver.execute_async_script(WAIT_SCRIPT, 0)
+        return events
@@ -0,0 +1,67 @@
+import os
+
+# Linux-only helpers reading /proc; they return 0 / [] where /proc is unavailable
+
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+
+
+def _read_stat(pid):
+    """Fields of /proc/<pid>/stat after the command name (which may contain spaces)"""
+    with open(f"/proc/{pid}/stat") as f:
+        data = f.read()
+    return data[data.rindex(')') + 2:].split()
+
+
+def child_pids(pid):
+    """Every descendant of a process"""
+    parents = {}
+    try:
+        entries = os.listdir('/proc')
+    except OSError:
+        return []
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            parents.setdefault(int(_read_stat(entry)[1]), []).append(int(entry))
+        except (OSError, ValueError, IndexError):
+            continue  # Process exited while we were scanning
+
+    descendants = []
+    pending = [pid]
+    while pending:
+        children = parents.get(pending.pop(), [])
+        descendants.extend(children)
+        pending.extend(children)
+    return descendants
+
+
+def rss_mb(pid):
+    """Resident memory of one process in MB"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError):
+        pass
+    return 0.0
+
+
+def cpu_seconds(pid):
+    """User plus system CPU time of one process"""
+    try:
+        fields = _read_stat(pid)
+        return (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+
+def tree_rss_mb(pid):
+    """Resident memory of a process and all its descendants in MB"""
+    return sum(rss_mb(p) for p in [pid] + child_pids(pid))
+
+
+def tree_cpu_seconds(pid):
+    """CPU time of a process and its live descendants"""
+    return sum(cpu_seconds(p) for p in [pid] + child_pids(pid))
@@ -0,0 +1,95 @@
+import os
+import shutil
+import subprocess
+
+import sounddevice as sd
+
+# Give every meeting its own null sink when PulseAudio is running
+AUDIO_ISOLATION = os.environ.get('AUDIO_ISOLATION', 'true') == 'true'
+
+
+def _pactl(*args):
+    result = subprocess.run(['pactl', *args], capture_output=True, text=True, timeout=10)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip() or f"pactl {' '.join(args)} failed")
+    return result.stdout.strip()
+
+
+def pulse_available():
+    """True if pactl is installed and can reach a running PulseAudio server"""
+    if not shutil.which('pactl'):
+        return False
+    try:
+        _pactl('info')
+        return True
+    except Exception:
+        return False
+
+
+def pulse_input_device():
+    """Index of the PortAudio input device that goes through PulseAudio, or None"""
+    try:
+        for index, device in enumerate(sd.query_devices()):
+            if device['max_input_channels'] > 0 and device['name'] == 'pulse':
+                return index
+    except Exception as e:
+        print(f"⚠️ Could not list audio devices: {e}")
+    return None
+
+
+class VirtualSink:
+    """A PulseAudio null sink dedicated to one meeting.
+
+    The browser plays into the sink (PULSE_SINK in its environment) and the
+    recorder captures the sink's monitor source, so sessions running side by
+    side on one host never hear each other.
+    """
+    def __init__(self, name):
+        self.name = ''.join(c if c.isalnum() or c in '_-' else '_' for c in name)
+        self.module_id = None
+
+    @property
+    def monitor(self):
+        return f"{self.name}.monitor"
+
+    def create(self):
+        self.module_id = _pactl(
+            'load-module', 'module-null-sink',
+            f"sink_name={self.name}",
+            f"sink_properties=device.description={self.name}"
+        )
+        print(f"🔈 Virtual sink created: {self.name} (module {self.module_id})")
+        return self
+
+    def remove(self):
+        if self.module_id is None:
+            return
+        try:
+            _pactl('unload-module', self.module_id)
+            print(f"🔇 Virtual sink removed: {self.name}")
+        except Exception as e:
+            print(f"⚠️ Could not remove virtual sink {self.name}: {e}")
+        self.module_id = None
+
+    def browser_env(self):
+        """Environment for the browser process so its audio plays into this sink"""
+        return {**os.environ, 'PULSE_SINK': self.name}
+
+
+def create_session_sink(meeting_name):
+    """Dedicated sink for a meeting, or None to fall back to the default devices"""
+    if not AUDIO_ISOLATION:
+        return None
+    if not pulse_available():
+        print("⚠️ PulseAudio not available - recording from the default input device")
+        return None
+    # The recorder reaches the sink's monitor only through PortAudio's 'pulse'
+    # device; without it a private sink would swallow the meeting audio
+    if pulse_input_device() is None:
+        print("⚠️ No PortAudio 'pulse' input device - recording from the default input device")
+        return None
+    try:
+        return VirtualSink(f"meet_{os.getpid()}_{meeting_name[:40]}").create()
+    except Exception as e:
+        print(f"⚠️ Could not create virtual sink, recording from the default input device: {e}")
+        return None
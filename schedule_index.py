@@ -0,0 +1,159 @@
+import bisect
+import datetime
+from collections import namedtuple
+
+from calendar_cache import event_end, event_start
+
+# Join a meeting from this long before its start...
+JOIN_EARLY_SECONDS = 180
+# ...until this long after it started
+JOIN_LATE_SECONDS = 600
+
+ScheduledMeeting = namedtuple('ScheduledMeeting', ['start', 'end', 'title', 'url', 'event'])
+
+
+def meeting_link(event):
+    """Video link of an event: hangoutLink, or a video entry point in conferenceData"""
+    if event.get('hangoutLink'):
+        return event['hangoutLink']
+    for entry_point in event.get('conferenceData', {}).get('entryPoints', []):
+        if entry_point.get('entryPointType') == 'video' and entry_point.get('uri'):
+            return entry_point['uri']
+    return None
+
+
+def _timestamp(value):
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+    return value.timestamp()
+
+
+class ScheduleIndex:
+    """Meetings with a video link, sorted by UTC start, queried by bisection.
+
+    Built once per calendar sync. Start times are parsed here and nowhere
+    else, and every lookup is a binary search over the sorted starts instead
+    of a scan over the raw events.
+    """
+    def __init__(self, events):
+        meetings = []
+        for event in events:
+            url = meeting_link(event)
+            if not url:
+                continue
+            try:
+                start = event_start(event)
+                end = max(event_end(event), start)
+            except Exception as e:
+                print(f"⚠️ Skipping event with unreadable times '{event.get('summary', 'No Title')}': {e}")
+                continue
+            meetings.append(ScheduledMeeting(start, end, event.get('summary', 'No Title'), url, event))
+
+        meetings.sort(key=lambda meeting: meeting.start)
+        self.meetings = meetings
+        self.starts = [meeting.start.timestamp() for meeting in meetings]
+        # Longest meeting bounds how far back an overlapping meeting can start
+        self.max_duration = max((m.end.timestamp() - m.start.timestamp() for m in meetings), default=0)
+
+    def __len__(self):
+        return len(self.meetings)
+
+    def join_window(self, now, early=JOIN_EARLY_SECONDS, late=JOIN_LATE_SECONDS):
+        """Meetings starting between `late` seconds ago and `early` seconds from now"""
+        now = _timestamp(now)
+        low = bisect.bisect_left(self.starts, now - late)
+        high = bisect.bisect_right(self.starts, now + early)
+        return self.meetings[low:high]
+
+    def next_start(self, now):
+        """The first meeting starting after `now`, or None"""
+        index = bisect.bisect_right(self.starts, _timestamp(now))
+        return self.meetings[index] if index < len(self.meetings) else None
+
+    def next_join_time(self, now, early=JOIN_EARLY_SECONDS):
+        """When the next meeting not yet joinable enters its join window, or None"""
+        index = bisect.bisect_right(self.starts, _timestamp(now) + early)
+        if index == len(self.meetings):
+            return None
+        return self.meetings[index].start - datetime.timedelta(seconds=early)
+
+    def overlapping(self, start, end):
+        """Meetings that intersect [start, end)"""
+        start, end = _timestamp(start), _timestamp(end)
+        low = bisect.bisect_left(self.starts, start - self.max_duration)
+        high = bisect.bisect_left(self.starts, end)
+        return [
+            meeting for meeting in self.meetings[low:high]
+            if meeting.end.timestamp() > start or meeting.start.timestamp() >= start
+        ]
+
+
+def _test_event(event_id, starts_at, ends_at=None, **fields):
+    event = {'id': event_id, 'summary': event_id, 'hangoutLink': f'https://meet.google.com/{event_id}'}
+    event['start'] = {'dateTime': starts_at.isoformat()}
+    if ends_at is not None:
+        event['end'] = {'dateTime': ends_at.isoformat()}
+    event.update(fields)
+    return event
+
+
+def test_schedule_index():
+    """Check the index against hand-made events: window edges, all-day events, links, overlaps"""
+    print("🧪 Testing schedule index...")
+    now = datetime.datetime(2024, 5, 6, 12, 0, tzinfo=datetime.timezone.utc)
+    seconds = lambda offset: now + datetime.timedelta(seconds=offset)
+
+    events = [
+        _test_event('too_late', seconds(-JOIN_LATE_SECONDS - 1)),
+        _test_event('last_chance', seconds(-JOIN_LATE_SECONDS)),
+        _test_event('first_chance', seconds(JOIN_EARLY_SECONDS)),
+        _test_event('too_early', seconds(JOIN_EARLY_SECONDS + 1)),
+        _test_event('no_link', seconds(0), hangoutLink=None),
+        _test_event('bad_time', seconds(0), start={'dateTime': 'not a time'}),
+    ]
+    # A link found only in conferenceData, on an all-day event (midnight UTC)
+    all_day = _test_event('all_day', now, start={'date': '2024-05-07'}, end={'date': '2024-05-08'}, hangoutLink=None)
+    all_day['conferenceData'] = {'entryPoints': [
+        {'entryPointType': 'phone', 'uri': 'tel:+1-555-0100'},
+        {'entryPointType': 'video', 'uri': 'https://meet.google.com/all-day'}
+    ]}
+    events.append(all_day)
+
+    index = ScheduleIndex(events)
+    assert len(index) == 5, [meeting.title for meeting in index.meetings]
+
+    # Both ends of the join window are inclusive
+    assert [meeting.title for meeting in index.join_window(now)] == ['last_chance', 'first_chance']
+    # A naive `now` is read as UTC
+    assert [meeting.title for meeting in index.join_window(now.replace(tzinfo=None))] == ['last_chance', 'first_chance']
+
+    midnight = datetime.datetime(2024, 5, 7, tzinfo=datetime.timezone.utc)
+    meeting = index.next_start(seconds(JOIN_EARLY_SECONDS + 1))
+    assert meeting.title == 'all_day' and meeting.start == midnight, meeting
+    assert meeting.url == 'https://meet.google.com/all-day'
+    assert meeting.end == midnight + datetime.timedelta(days=1)
+    assert index.next_start(midnight) is None
+    assert index.next_join_time(now) == seconds(1)
+    assert index.next_join_time(midnight) is None
+
+    # Overlaps use [start, end): touching intervals do not overlap, but a
+    # meeting without an end that starts inside the range does
+    meetings = ScheduleIndex([
+        _test_event('long', seconds(-3600), seconds(3600)),
+        _test_event('before', seconds(-1200), seconds(-600)),
+        _test_event('instant', seconds(300)),
+        _test_event('after', seconds(600), seconds(1200)),
+    ])
+    overlap = lambda start, end: [m.title for m in meetings.overlapping(seconds(start), seconds(end))]
+    assert overlap(-600, 600) == ['long', 'instant'], overlap(-600, 600)
+    assert overlap(-1500, -1200) == ['long']
+    assert overlap(3600, 4000) == []
+    assert overlap(1199, 1200) == ['long', 'after']
+
+    print("✅ Schedule index test passed!")
+    return True
+
+
+if __name__ == '__main__':
+    if not test_schedule_index():
+        exit(1)
@@ -0,0 +1,150 @@
+import datetime
+import heapq
+import itertools
+import os
+import signal
+import threading
+import time
+import traceback
+
+from calendar_reader import get_schedule
+from schedule_index import JOIN_EARLY_SECONDS, JOIN_LATE_SECONDS
+from session_pool import MeetingDispatcher
+
+# Incremental calendar syncs are cheap, so the schedule is refreshed often
+SYNC_INTERVAL_SECONDS = int(os.environ.get('SCHEDULER_SYNC_SECONDS', '60'))
+
+# While every session slot is busy, a due meeting is retried this often until its window closes
+BUSY_RETRY_SECONDS = 30
+
+
+def _utc_now():
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+def _meeting_key(meeting):
+    return (meeting.event.get('id'), meeting.start)
+
+
+def _clean_title(title):
+    return "".join(c for c in title if c.isalnum() or c in (' ', '-', '_')).rstrip()
+
+
+class MeetingScheduler:
+    """Long-running scheduler that joins meetings as their join windows open.
+
+    Pending work lives in a heap of (due time, kind, payload) timers: a
+    calendar sync that re-arms itself, plus one join timer per meeting. The
+    loop sleeps until the earliest timer is due, so it does nothing between
+    events, and a stop signal wakes it straight away.
+    """
+    def __init__(self, sync_interval=SYNC_INTERVAL_SECONDS, dispatcher=None):
+        self.sync_interval = sync_interval
+        self.dispatcher = dispatcher or MeetingDispatcher(warm_browsers=True)
+        self.timers = []
+        self.sequence = itertools.count()  # Tie-breaker so payloads are never compared
+        self.schedule = None
+        self.armed = set()    # Meetings with a join timer in the heap
+        self.joined = set()   # Meetings already dispatched
+        self.stop_event = threading.Event()
+
+    def run(self):
+        print("🤖 Google Meet Bot - scheduler mode")
+        self.dispatcher.warm_up()
+        self._push(time.time(), 'sync', None)
+
+        while not self.stop_event.is_set():
+            due, _, kind, payload = self.timers[0]
+            delay = due - time.time()
+            if delay > 0:
+                # Sleep until the next timer; stop() interrupts the wait
+                self.stop_event.wait(delay)
+                continue
+
+            heapq.heappop(self.timers)
+            try:
+                if kind == 'sync':
+                    self._sync()
+                elif kind == 'join':
+                    self._join(payload)
+            except Exception as e:
+                print(f"❌ Scheduler error handling {kind}: {e}")
+                traceback.print_exc()
+
+        self._shutdown()
+
+    def stop(self, *args):
+        print("🛑 Scheduler stopping...")
+        self.stop_event.set()
+
+    def _push(self, when, kind, payload):
+        heapq.heappush(self.timers, (when, next(self.sequence), kind, payload))
+
+    def _sync(self):
+        """Refresh the schedule and arm a join timer for every meeting not yet armed"""
+        try:
+            self.schedule = get_schedule()
+        except Exception as e:
+            print(f"❌ Calendar sync failed: {e}")
+        finally:
+            self._push(time.time() + self.sync_interval, 'sync', None)
+
+        if self.schedule is None:
+            return
+
+        now = _utc_now()
+        cutoff = now - datetime.timedelta(seconds=JOIN_LATE_SECONDS)
+        self.joined = {key for key in self.joined if key[1] >= cutoff}
+        for meeting in self.schedule.meetings:
+            key = _meeting_key(meeting)
+            if key in self.armed or key in self.joined or meeting.start < cutoff:
+                continue
+            join_at = meeting.start - datetime.timedelta(seconds=JOIN_EARLY_SECONDS)
+            self._push(max(join_at, now).timestamp(), 'join', key)
+            self.armed.add(key)
+            print(f"⏰ Join armed for '{meeting.title}' at {join_at}")
+
+        next_join = self.schedule.next_join_time(now)
+        if next_join:
+            print(f"💤 Next join window opens in {(next_join - now).total_seconds() / 60:.1f} minutes")
+
+    def _join(self, key):
+        self.armed.discard(key)
+        if key in self.joined:
+            return
+
+        # The timer was armed from an earlier sync; only join if the meeting is
+        # still on the calendar at that time and its window has not closed
+        meeting = next((m for m in self.schedule.join_window(_utc_now()) if _meeting_key(m) == key), None)
+        if meeting is None:
+            print(f"⏭️ Meeting {key[0]} was moved, cancelled or missed - skipping")
+            return
+
+        if not self.dispatcher.has_capacity():
+            print(f"⏳ All {self.dispatcher.max_sessions} session slots busy, "
+                  f"retrying '{meeting.title}' in {BUSY_RETRY_SECONDS}s")
+            self._push(time.time() + BUSY_RETRY_SECONDS, 'join', key)
+            self.armed.add(key)
+            return
+
+        self.joined.add(key)
+        print(f"🎯 JOINING MEETING: {meeting.title}")
+        print(f"🔗 URL: {meeting.url}")
+        self.dispatcher.submit(meeting.url, _clean_title(meeting.title))
+
+    def _shutdown(self):
+        if self.dispatcher.active_count():
+            print(f"⏳ Waiting for {self.dispatcher.active_count()} recordings to finish...")
+        self.dispatcher.shutdown()
+        print("👋 Scheduler stopped")
+
+
+def main():
+    scheduler = MeetingScheduler()
+    signal.signal(signal.SIGTERM, scheduler.stop)
+    signal.signal(signal.SIGINT, scheduler.stop)
+    scheduler.run()
+
+
+if __name__ == "__main__":
+    main()
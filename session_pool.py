@@ -0,0 +1,222 @@
+import multiprocessing
+import os
+import queue
+import resource
+import signal
+import threading
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, wait as wait_futures
+
+from process_stats import child_pids, rss_mb, tree_cpu_seconds
+from upload_manager import resume_pending_uploads, wait_for_uploads
+
+# How many meetings one host records at the same time
+MAX_CONCURRENT_MEETINGS = int(os.environ.get('MAX_CONCURRENT_MEETINGS', '2'))
+
+# How often a session samples its memory for the peak RSS in its report
+RSS_SAMPLE_SECONDS = 5
+
+# Longest a finished session (or the parent at shutdown) waits for its uploads;
+# whatever is still running stays queued for a later retry
+UPLOAD_WAIT_SECONDS = 600
+
+
+def _init_worker(warm_browsers, worker_pids):
+    """Worker start-up: report the worker's pid, optionally launch a browser before the first meeting"""
+    worker_pids.put(os.getpid())
+    if warm_browsers:
+        from browser_pool import get_browser_pool
+        get_browser_pool().warm_up()
+
+
+def _process_cpu_seconds():
+    """CPU of this worker, its live browser processes and every reaped child"""
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return tree_cpu_seconds(os.getpid()) + children.ru_utime + children.ru_stime
+
+
+def _run_session(meet_url, meeting_name):
+    """Worker entry point: one meeting on the worker's browser, then a usage report.
+
+    Workers outlive sessions (so their browsers stay warm), so the report is
+    built from differences: CPU used during the session by the worker and
+    its browser processes, and the peak memory sampled while it ran.
+    """
+    from browser_pool import AUDIO_ONLY_BROWSER
+    from meet_joiner import join_meet
+
+    started = time.time()
+    cpu_before = _process_cpu_seconds()
+    peak = {'worker': 0.0, 'browser': 0.0}
+    done = threading.Event()
+
+    def sample_memory():
+        while True:
+            peak['worker'] = max(peak['worker'], rss_mb(os.getpid()))
+            # chromedriver, Chrome and its helpers all descend from the worker
+            peak['browser'] = max(peak['browser'], sum(rss_mb(pid) for pid in child_pids(os.getpid())))
+            if done.is_set():
+                return
+            done.wait(RSS_SAMPLE_SECONDS)
+
+    sampler = threading.Thread(target=sample_memory, daemon=True)
+    sampler.start()
+
+    report = {
+        'meeting': meeting_name, 'url': meet_url, 'pid': os.getpid(), 'ok': False, 'error': None,
+        # So reports from audio-only and full browsers can be compared
+        'browser_profile': 'audio-only' if AUDIO_ONLY_BROWSER else 'full'
+    }
+    try:
+        join_meet(meet_url, meeting_name)
+        report['ok'] = True
+    except Exception as e:
+        print(f"❌ Session error for '{meeting_name}': {e}")
+        traceback.print_exc()
+        report['error'] = str(e)
+    finally:
+        # Uploads belong to the session; finish them before reporting it done
+        wait_for_uploads(timeout=UPLOAD_WAIT_SECONDS)
+        done.set()
+        sampler.join()
+
+    wall_seconds = time.time() - started
+    cpu_seconds = _process_cpu_seconds() - cpu_before
+    report.update({
+        'wall_seconds': round(wall_seconds, 1),
+        'cpu_seconds': round(cpu_seconds, 1),
+        # Average cores kept busy, the figure that decides how many sessions fit on a host
+        'cpu_percent': round(100 * cpu_seconds / wall_seconds, 1) if wall_seconds else 0.0,
+        'worker_max_rss_mb': round(peak['worker'], 1),
+        'browser_max_rss_mb': round(peak['browser'], 1)
+    })
+    return report
+
+
+class MeetingDispatcher:
+    """Record several meetings at once, one worker process per meeting.
+
+    Each running session has its own process (and with it its own browser,
+    audio sink and recorder), up to `max_sessions` at a time. Workers are
+    kept between meetings so their browsers stay warm. Finished sessions
+    report wall time, CPU time and peak memory, kept in `reports`.
+    """
+    def __init__(self, max_sessions=MAX_CONCURRENT_MEETINGS, warm_browsers=False):
+        self.max_sessions = max_sessions
+        # spawn: workers must not inherit the parent's threads and locks
+        context = multiprocessing.get_context('spawn')
+        # Each worker reports its pid here when it starts, so terminate() can kill it
+        self.worker_pid_queue = context.Queue()
+        self.worker_pids = set()
+        self.executor = ProcessPoolExecutor(
+            max_workers=max_sessions,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(warm_browsers, self.worker_pid_queue)
+        )
+        self.lock = threading.Lock()
+        self.active = {}   # future -> meeting name
+        self.reports = []
+        self.terminating = False
+
+        # Uploads orphaned by processes that exited (an earlier run, a crashed worker)
+        resume_pending_uploads()
+
+    def warm_up(self):
+        """Start every worker now, so each has a browser ready before the first meeting"""
+        # Workers are spawned on demand; back-to-back submits find no idle worker
+        # and start one each, and the initializer launches its browser
+        futures = [self.executor.submit(os.getpid) for _ in range(self.max_sessions)]
+        wait_futures(futures)
+        print(f"🔥 {self.max_sessions} session workers ready")
+
+    def active_count(self):
+        with self.lock:
+            return len(self.active)
+
+    def has_capacity(self):
+        return self.active_count() < self.max_sessions
+
+    def submit(self, meet_url, meeting_name):
+        """Start recording a meeting in a worker; returns a future resolving to its report"""
+        future = self.executor.submit(_run_session, meet_url, meeting_name)
+        with self.lock:
+            self.active[future] = meeting_name
+            in_use = len(self.active)
+        if in_use > self.max_sessions:
+            print(f"🕒 Session queued for '{meeting_name}' (all {self.max_sessions} slots in use)")
+        else:
+            print(f"🚀 Session started for '{meeting_name}' ({in_use}/{self.max_sessions} slots in use)")
+        future.add_done_callback(self._session_done)
+        return future
+
+    def wait(self, timeout=None):
+        """Block until every running session has finished; True if they all did"""
+        with self.lock:
+            futures = list(self.active)
+        _, not_done = wait_futures(futures, timeout=timeout)
+        return not not_done
+
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait, cancel_futures=not wait)
+        if wait:
+            wait_for_uploads(timeout=UPLOAD_WAIT_SECONDS)
+
+    def terminate(self):
+        """Kill every worker and its browser now, ending sessions that are still recording.
+
+        shutdown(wait=False) only stops new work: running spawn workers keep
+        going and the interpreter waits for them at exit. Their unfinished
+        uploads stay queued for the next run. Workers are found by the pids
+        they reported at start-up, so one that is still starting up at this
+        moment can be missed.
+        """
+        self.terminating = True
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        worker_pids = self._reported_worker_pids()
+        # Find every browser process before killing anything: once one worker
+        # dies the executor stops the others, and their children get reparented
+        doomed = []
+        for worker_pid in worker_pids:
+            # Chrome and chromedriver first, so nothing is left orphaned
+            doomed.extend(child_pids(worker_pid) + [worker_pid])
+        for pid in doomed:
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except OSError:
+                pass
+        print(f"🛑 Terminated {len(worker_pids)} session workers")
+
+    def _reported_worker_pids(self):
+        while True:
+            try:
+                self.worker_pids.add(self.worker_pid_queue.get_nowait())
+            except queue.Empty:
+                return sorted(self.worker_pids)
+
+    def _session_done(self, future):
+        with self.lock:
+            meeting_name = self.active.pop(future, None)
+
+        try:
+            report = future.result()
+        except Exception as e:
+            # The worker process died (crash, OOM kill) before it could report
+            print(f"❌ Session for '{meeting_name}' crashed: {e}")
+            report = {'meeting': meeting_name, 'ok': False, 'error': str(e)}
+
+        with self.lock:
+            self.reports.append(report)
+
+        # A crashed worker's uploads (or uploads that ran out of retries) are taken
+        # over here - except when we are killing the workers to stop on time
+        if not self.terminating:
+            resume_pending_uploads()
+
+        if report.get('ok'):
+            print(f"✅ Session finished: '{meeting_name}' - {report['wall_seconds']}s wall, "
+                  f"{report['cpu_seconds']}s CPU ({report['cpu_percent']}%), peak RSS {report['worker_max_rss_mb']} MB worker / "
+                  f"{report['browser_max_rss_mb']} MB browser ({report['browser_profile']} browser)")
+        else:
+            print(f"⚠️ Session failed: '{meeting_name}': {report.get('error')}")
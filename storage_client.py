@@ -0,0 +1,43 @@
+import os
+import threading
+
+import boto3
+from botocore.config import Config
+from dotenv import load_dotenv
+
+load_dotenv()
+
+_s3_client = None
+_client_lock = threading.Lock()
+
+
+def get_s3_client():
+    """Process-wide B2 (S3-compatible) client, created on first use.
+
+    botocore clients are thread-safe, so the recorder, live uploads and the
+    upload workers all share one client and its connection pool instead of
+    each loading the service model and opening new TLS connections.
+    """
+    global _s3_client
+    if _s3_client is None:
+        with _client_lock:
+            if _s3_client is None:
+                # Enough connections for every upload worker's multipart threads
+                max_pool_connections = int(os.environ.get('B2_MAX_POOL_CONNECTIONS', '20'))
+                _s3_client = boto3.session.Session().client(
+                    's3',
+                    endpoint_url=os.environ.get('B2_ENDPOINT'),
+                    aws_access_key_id=os.environ.get('B2_KEY_ID'),
+                    aws_secret_access_key=os.environ.get('B2_APPLICATION_KEY'),
+                    config=Config(
+                        max_pool_connections=max_pool_connections,
+                        retries={'max_attempts': 3, 'mode': 'standard'},
+                        tcp_keepalive=True
+                    )
+                )
+                print(f"✅ B2 client initialized (pool of {max_pool_connections} connections)")
+    return _s3_client
+
+
+def get_bucket_name():
+    return os.environ.get('B2_BUCKET_NAME')
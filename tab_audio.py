@@ -0,0 +1,169 @@
+import base64
+import os
+
+import numpy as np
+
+# 'tab' records the meeting's WebRTC audio inside the page instead of from an audio device
+TAB_AUDIO_CAPTURE = os.environ.get('AUDIO_CAPTURE_MODE') == 'tab'
+
+# Audio kept in the page between reads before the oldest is dropped
+TAB_BUFFER_SECONDS = 120
+
+# Registered before any page script runs, so every RTCPeerConnection Meet
+# creates is seen. Remote audio tracks are collected; once started they are
+# mixed in an AudioContext running at the recording rate (the browser does
+# the resampling) and buffered as int16 PCM until Python reads them.
+TAB_AUDIO_SCRIPT = """
+(() => {
+    if (window.__meetBotAudio) return;
+    const bot = window.__meetBotAudio = {
+        tracks: new Map(), sources: new Map(), context: null, mixer: null,
+        chunks: [], frames: 0, dropped: 0
+    };
+
+    bot.connect = (track) => {
+        const source = bot.context.createMediaStreamSource(new MediaStream([track]));
+        source.connect(bot.mixer);
+        bot.sources.set(track.id, source);
+    };
+    bot.add = (track) => {
+        if (bot.tracks.has(track.id)) return;
+        bot.tracks.set(track.id, track);
+        track.addEventListener('ended', () => {
+            const source = bot.sources.get(track.id);
+            if (source) source.disconnect();
+            bot.sources.delete(track.id);
+            bot.tracks.delete(track.id);
+        });
+        if (bot.context) bot.connect(track);
+    };
+
+    const NativePeerConnection = window.RTCPeerConnection;
+    if (NativePeerConnection) {
+        const PeerConnection = function (...args) {
+            const connection = new NativePeerConnection(...args);
+            connection.addEventListener('track', (event) => {
+                if (event.track.kind === 'audio') bot.add(event.track);
+            });
+            return connection;
+        };
+        PeerConnection.prototype = NativePeerConnection.prototype;
+        Object.setPrototypeOf(PeerConnection, NativePeerConnection);
+        window.RTCPeerConnection = PeerConnection;
+    }
+
+    bot.start = (sampleRate, maxFrames) => {
+        if (bot.context) return;
+        const context = bot.context = new AudioContext({sampleRate: sampleRate});
+        bot.mixer = context.createGain();
+        // Mono in, nothing out: the processor only copies what the mixer hears
+        const processor = bot.processor = context.createScriptProcessor(4096, 1, 1);
+        processor.onaudioprocess = (event) => {
+            const input = event.inputBuffer.getChannelData(0);
+            const pcm = new Int16Array(input.length);
+            for (let i = 0; i < input.length; i++) {
+                const sample = Math.max(-1, Math.min(1, input[i]));
+                pcm[i] = sample < 0 ? sample * 32768 : sample * 32767;
+            }
+            bot.chunks.push(pcm);
+            bot.frames += pcm.length;
+            while (bot.frames > maxFrames) {
+                const oldest = bot.chunks.shift();
+                bot.frames -= oldest.length;
+                bot.dropped += oldest.length;
+            }
+        };
+        bot.mixer.connect(processor);
+        processor.connect(context.destination);
+        bot.tracks.forEach(bot.connect);
+        context.resume();
+    };
+
+    bot.read = () => {
+        const pcm = new Int16Array(bot.frames);
+        let offset = 0;
+        for (const chunk of bot.chunks) {
+            pcm.set(chunk, offset);
+            offset += chunk.length;
+        }
+        bot.chunks = [];
+        bot.frames = 0;
+        const bytes = new Uint8Array(pcm.buffer);
+        let binary = '';
+        for (let i = 0; i < bytes.length; i += 0x8000) {
+            binary += String.fromCharCode.apply(null, bytes.subarray(i, i + 0x8000));
+        }
+        return {
+            pcm: btoa(binary), tracks: bot.tracks.size, dropped: bot.dropped,
+            state: bot.context ? bot.context.state : 'stopped'
+        };
+    };
+
+    bot.stop = () => {
+        if (!bot.context) return;
+        bot.processor.disconnect();
+        bot.context.close();
+        bot.context = null;
+        bot.sources.clear();
+    };
+})();
+"""
+
+
+class TabAudioCapture:
+    """Capture backend that records the meeting's remote audio inside the page.
+
+    The page hook taps Meet's WebRTC audio tracks directly, so no audio
+    device, PulseAudio loopback or per-session sink is involved and each
+    capture only ever contains its own meeting. `install` must run before
+    the meeting is opened; AudioRecorder then calls `start`, `read` and
+    `stop` from its capture thread.
+    """
+    def __init__(self, driver):
+        self.driver = driver
+        self.script_id = None
+        self.sample_rate = None
+        self.tracks = 0
+        self.dropped_frames = 0
+
+    def install(self):
+        """Register the hook for every page this browser opens from now on"""
+        result = self.driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': TAB_AUDIO_SCRIPT})
+        self.script_id = result['identifier']
+
+    def remove(self):
+        """Unregister the hook so the next meeting on this (pooled) browser starts clean"""
+        if self.script_id is None:
+            return
+        try:
+            self.driver.execute_cdp_cmd('Page.removeScriptToEvaluateOnNewDocument', {'identifier': self.script_id})
+        except Exception as e:
+            print(f"⚠️ Could not remove the tab audio hook: {e}")
+        self.script_id = None
+
+    def start(self, sample_rate):
+        started = self.driver.execute_script(
+            "if (!window.__meetBotAudio) return false;"
+            "window.__meetBotAudio.start(arguments[0], arguments[1]); return true;",
+            sample_rate, int(sample_rate * TAB_BUFFER_SECONDS)
+        )
+        if not started:
+            raise RuntimeError("Tab audio hook is not installed in the meeting page")
+        self.sample_rate = sample_rate
+
+    def read(self):
+        """Mono int16 frames captured since the last read, shape (frames, 1)"""
+        result = self.driver.execute_script("return window.__meetBotAudio ? window.__meetBotAudio.read() : null")
+        if result is None:
+            # The page was replaced (the call is over); nothing more will arrive
+            return np.zeros((0, 1), dtype='int16')
+        self.tracks = result['tracks']
+        self.dropped_frames = result['dropped']
+        pcm = np.frombuffer(base64.b64decode(result['pcm']), dtype='<i2')
+        return pcm.reshape(-1, 1)
+
+    def stop(self):
+        try:
+            self.driver.execute_script("if (window.__meetBotAudio) window.__meetBotAudio.stop()")
+        except Exception as e:
+            print(f"⚠️ Could not stop tab audio capture: {e}")
@@ -0,0 +1,239 @@
+import fcntl
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
+from datetime import datetime
+
+from boto3.s3.transfer import TransferConfig
+
+from storage_client import get_bucket_name, get_s3_client
+
+MB = 1024 * 1024
+
+# Where pending uploads are remembered between runs; shared by every process on the host
+QUEUE_FILE = os.environ.get('B2_UPLOAD_QUEUE', 'recordings/upload_queue.json')
+
+# Multipart settings for upload_file: large parts keep request counts low on
+# hour-long recordings, a few threads per file keep the uplink busy
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=16 * MB,
+    multipart_chunksize=16 * MB,
+    max_concurrency=4,
+    use_threads=True
+)
+
+
+def _process_alive(pid):
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+        return True
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # Exists, owned by another user
+
+
+class UploadManager:
+    """Upload files to B2 on a bounded worker pool with retries and a persistent queue.
+
+    Every job is written to an on-disk queue before it runs and removed once it
+    succeeds, so uploads cut short by a crash or by exhausted retries are picked
+    up again later. Session workers share the queue file, so it is only changed
+    under an exclusive file lock and each job records the process that owns it;
+    `resume_pending` only takes over jobs whose owner is no longer running.
+    """
+    def __init__(self, s3_client, bucket_name, max_workers=3, max_attempts=5,
+                 base_delay=2.0, max_delay=60.0, queue_file=QUEUE_FILE):
+        self.s3_client = s3_client
+        self.bucket_name = bucket_name
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.queue_file = queue_file
+
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='b2-upload')
+        self.lock = threading.Lock()
+        self.futures = {}  # job id -> future, for jobs running in this process
+
+    def submit(self, filename, key, content_type, metadata=None, delete_after=False):
+        """Queue a file for upload; returns a future resolving to True on success"""
+        job = {
+            'id': uuid.uuid4().hex,
+            'filename': filename,
+            'key': key,
+            'content_type': content_type,
+            'metadata': metadata or {},
+            'delete_after': delete_after,
+            'owner': os.getpid(),
+            'queued_at': datetime.now().isoformat()
+        }
+        self._update_queue(lambda jobs: jobs.__setitem__(job['id'], job))
+        return self._schedule(job)
+
+    def resume_pending(self):
+        """Take over queued jobs whose owning process has exited (crashed, or an earlier run)"""
+        claimed = []
+
+        def claim(jobs):
+            for job in jobs.values():
+                if not _process_alive(job.get('owner')):
+                    job['owner'] = os.getpid()
+                    claimed.append(job)
+
+        self._update_queue(claim)
+        if claimed:
+            print(f"📋 Found {len(claimed)} pending uploads left by exited processes")
+
+        for job in claimed:
+            if os.path.exists(job['filename']):
+                print(f"🔁 Resuming pending upload: {job['key']}")
+                self._schedule(job)
+            else:
+                print(f"⚠️ Dropping pending upload, file is gone: {job['filename']}")
+                self._remove_job(job['id'])
+
+    def pending_count(self):
+        with self.lock:
+            return len(self.futures)
+
+    def wait(self, timeout=None):
+        """Block until every upload running in this process has finished"""
+        with self.lock:
+            futures = list(self.futures.values())
+        _, not_done = wait_futures(futures, timeout=timeout)
+        return not not_done
+
+    def _schedule(self, job):
+        future = self.executor.submit(self._run_job, job)
+        with self.lock:
+            self.futures[job['id']] = future
+        future.add_done_callback(lambda _, job_id=job['id']: self._forget_future(job_id))
+        return future
+
+    def _forget_future(self, job_id):
+        with self.lock:
+            self.futures.pop(job_id, None)
+
+    def _run_job(self, job):
+        size_mb = os.path.getsize(job['filename']) / MB if os.path.exists(job['filename']) else 0
+
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                self.s3_client.upload_file(
+                    job['filename'],
+                    self.bucket_name,
+                    job['key'],
+                    ExtraArgs={
+                        'ContentType': job['content_type'],
+                        'Metadata': job['metadata']
+                    },
+                    Config=TRANSFER_CONFIG
+                )
+                break
+            except Exception as e:
+                if attempt == self.max_attempts:
+                    print(f"❌ B2 upload failed after {attempt} attempts: {job['key']}: {e}")
+                    print(f"📁 Kept locally and queued for a later retry: {job['filename']}")
+                    # Give up ownership so the parent process can take the job over
+                    self._update_queue(lambda jobs: jobs[job['id']].update(owner=None) if job['id'] in jobs else None)
+                    return False
+
+                # Exponential backoff with jitter so parallel retries spread out
+                delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+                print(f"⚠️ B2 upload attempt {attempt} failed for {job['key']}: {e} - retrying in {delay:.1f}s")
+                time.sleep(delay)
+
+        print(f"✅ Successfully uploaded to B2: {job['key']} ({size_mb:.2f} MB)")
+        self._remove_job(job['id'])
+
+        if job['delete_after']:
+            try:
+                os.remove(job['filename'])
+                print(f"🗑️ Local file deleted: {job['filename']}")
+            except Exception as delete_error:
+                print(f"⚠️ Could not delete local file: {delete_error}")
+        return True
+
+    def _remove_job(self, job_id):
+        self._update_queue(lambda jobs: jobs.pop(job_id, None))
+
+    def _read_queue(self):
+        if not os.path.exists(self.queue_file):
+            return {}
+        try:
+            with open(self.queue_file) as f:
+                return {job['id']: job for job in json.load(f)}
+        except Exception as e:
+            print(f"⚠️ Could not read upload queue {self.queue_file}: {e}")
+            return {}
+
+    def _update_queue(self, change):
+        """Apply `change` to the on-disk queue (a dict of job id -> job) under an exclusive file lock"""
+        queue_dir = os.path.dirname(self.queue_file) or '.'
+        temp_file = None
+        with self.lock:
+            try:
+                os.makedirs(queue_dir, exist_ok=True)
+                with open(f"{self.queue_file}.lock", 'a') as lock_file:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                    jobs = self._read_queue()
+                    change(jobs)
+                    fd, temp_file = tempfile.mkstemp(prefix='.upload_queue.', suffix='.tmp', dir=queue_dir)
+                    with os.fdopen(fd, 'w') as f:
+                        json.dump(list(jobs.values()), f, indent=2)
+                    os.replace(temp_file, self.queue_file)
+                    temp_file = None
+            except Exception as e:
+                print(f"⚠️ Could not save upload queue: {e}")
+            finally:
+                if temp_file:
+                    try:
+                        os.remove(temp_file)
+                    except OSError:
+                        pass
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_upload_manager():
+    """Process-wide upload manager on the shared B2 client, created on first use"""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            max_workers = int(os.environ.get('B2_UPLOAD_WORKERS', '3'))
+            _manager = UploadManager(get_s3_client(), get_bucket_name(), max_workers=max_workers)
+        return _manager
+
+
+def resume_pending_uploads():
+    """Restart uploads left behind by exited processes.
+
+    Called by the parent process only; session workers just run their own
+    uploads, so two processes never upload (and then delete) the same file.
+    """
+    if not os.path.exists(QUEUE_FILE):
+        return
+    try:
+        get_upload_manager().resume_pending()
+    except Exception as e:
+        print(f"⚠️ Could not resume pending uploads: {e}")
+
+
+def wait_for_uploads(timeout=None):
+    """Wait for queued uploads before the process exits; True if all finished"""
+    if _manager is None or not _manager.pending_count():
+        return True
+    print(f"⏳ Waiting for {_manager.pending_count()} pending uploads...")
+    finished = _manager.wait(timeout)
+    if not finished:
+        print("⚠️ Some uploads are still running; they stay queued for the next run")
+    return finished